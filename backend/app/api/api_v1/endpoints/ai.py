@@ -1,25 +1,42 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Body
-from sse_starlette.sse import EventSourceResponse
-from fastapi.responses import StreamingResponse, JSONResponse
-from typing import List, Dict, Any, Optional
-from pydantic import ValidationError
+from fastapi.responses import JSONResponse
+from typing import List, Dict, Any
+from pydantic import TypeAdapter, ValidationError
 from datetime import datetime
-import json
-import time
 import asyncio
+import logging
+import time
+from functools import lru_cache
+
+import orjson
 
 from app.models.ai import (
     ChatRequest, ChatResponse, ModelsResponse,
-    ModelConnectionStatus, StreamEvent, Message
+    ModelConnectionStatus, Message
 )
 from app.services.ai.manager import AIServiceManager
 from app.services.deepseek_service import DeepseekService
 from app.api.deps import get_ai_service_manager, get_deepseek_service
+from app.api.sse import (
+    SSE_DONE, RawSSEResponse, encode_content, encode_data, encode_error, encode_text_error,
+    encode_thinking
+)
 from app.utils.logger import get_logger
 
 router = APIRouter()
 logger = get_logger(__name__)
 
+# 每隔多少个流式事件检查一次客户端是否已断开
+_DISCONNECT_CHECK_INTERVAL = 16
+
+# 消息列表校验器，模块加载时构建一次
+_MESSAGE_LIST_ADAPTER = TypeAdapter(List[Message])
+
+@lru_cache(maxsize=1)
+def _format_check_time(epoch_seconds: int) -> str:
+    """格式化状态检查时间，同一秒内的请求复用同一个字符串"""
+    return datetime.fromtimestamp(epoch_seconds).isoformat()
+
 @router.get("/models", response_model=ModelsResponse)
 async def get_models(
     ai_manager: AIServiceManager = Depends(get_ai_service_manager)
@@ -37,7 +54,7 @@ async def check_model_status(
     return ModelConnectionStatus(
         connected=is_connected,
         message=message,
-        last_check=datetime.now().isoformat()
+        last_check=_format_check_time(int(time.time()))
     )
 
 @router.post("/chat", response_model=ChatResponse)
@@ -56,51 +73,32 @@ async def chat(
         # 记录请求信息，帮助排查问题
         logger.info(f"接收聊天请求: 模型={request.model}, 消息数量={len(request.messages)}")
         
-        # 记录详细的消息内容用于调试
-        message_summary = []
-        for i, msg in enumerate(request.messages):
-            # 限制内容长度防止日志过大
-            content_preview = msg.content[:50] + "..." if len(msg.content) > 50 else msg.content
-            message_summary.append(f"[{i}] {msg.role}: {content_preview}")
-        
-        logger.debug(f"消息详情: {'; '.join(message_summary)}")
-        
-        # 格式化请求消息，确保时间戳正确
-        for msg in request.messages:
-            if not msg.timestamp:
-                msg.timestamp = None  # 让模型自动设置默认值
-        
-        # 获取聊天响应
-        response = await ai_manager.chat(request)
-        
-        # 确保content字段存在，方便前端访问
-        if not hasattr(response, 'content') or not response.content:
-            response.content = response.message.content
+        # 记录详细的消息内容用于调试（仅在DEBUG级别开启时构建摘要）
+        if logger.isEnabledFor(logging.DEBUG):
+            message_summary = []
+            for i, msg in enumerate(request.messages):
+                # 限制内容长度防止日志过大
+                content = msg.content
+                content_preview = content if len(content) <= 50 else content[:50] + "..."
+                message_summary.append(f"[{i}] {msg.role}: {content_preview}")
             
-        return response
-    except ValidationError as e:
-        # 记录详细验证错误
-        logger.error(f"请求参数验证错误: {str(e)}")
-        
-        # 提取并记录原始请求数据，帮助排查问题
-        try:
-            if hasattr(request, "__dict__"):
-                req_dict = {k: str(v)[:100] for k, v in request.__dict__.items()}
-                logger.error(f"原始请求数据: {req_dict}")
-        except Exception as ex:
-            logger.error(f"无法记录原始请求数据: {str(ex)}")
-        
-        # 尝试提取更具体的错误信息
-        error_detail = str(e)
-        loc = ["body", "request"]
-        
-        # 如果错误包含字段位置信息，提取出来
-        if hasattr(e, "errors") and isinstance(e.errors(), list):
-            errors = e.errors()
-            if errors and "loc" in errors[0]:
-                loc = errors[0]["loc"]
-                error_detail = errors[0].get("msg", str(e))
+            logger.debug(f"消息详情: {'; '.join(message_summary)}")
         
+        # 获取聊天响应（content字段由ChatResponse自动从message填充）
+        return await ai_manager.chat(request)
+    except ValidationError as e:
+        # 只调用一次errors()，取第一条错误的位置和描述
+        errs = e.errors()
+        first = errs[0] if errs else {}
+        loc = first.get("loc", ["body", "request"])
+        error_detail = first.get("msg", "")
+        logger.error(f"请求参数验证错误: {error_detail} (共{len(errs)}处, 位置: {loc})")
+
+        # 原始请求数据预览仅在DEBUG级别下记录，帮助排查问题
+        if logger.isEnabledFor(logging.DEBUG) and hasattr(request, "__dict__"):
+            req_dict = {k: str(v)[:100] for k, v in request.__dict__.items()}
+            logger.debug(f"原始请求数据: {req_dict}")
+
         # 返回更友好的错误信息
         return JSONResponse(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -121,74 +119,68 @@ async def chat(
             detail=f"服务器错误: {str(e)}"
         )
 
-def encode_event(event: dict) -> str:
-    """将事件编码为SSE格式字符串"""
-    if isinstance(event, str):
-        # 如果已经是字符串（可能是SSE格式）
-        return event
-    
-    # 如果是字典，转换为SSE格式
-    if "event" in event:
-        output = [f"event: {event['event']}"]
-    else:
-        output = ["event: message"]
-    
-    if "data" in event:
-        data = event["data"]
-        json_data = json.dumps(data)
-        output.append(f"data: {json_data}")
-    
-    return "\n".join(output) + "\n\n"
-
 @router.post("/chat/stream")
 async def chat_stream(
-    request: ChatRequest,
     req: Request,
     ai_manager: AIServiceManager = Depends(get_ai_service_manager)
 ):
-    """AI聊天API（流式响应） - 修复版本"""
+    """AI聊天API（流式响应） - 修复版本
+
+    只从原始请求体中读取模型字段，完整的ChatRequest校验延迟到服务层进行
+    """
     try:
-        if not request.model:
+        try:
+            body = orjson.loads(await req.body())
+        except orjson.JSONDecodeError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="请求体不是有效的JSON"
+            ) from None
+
+        model = body.get("model") if isinstance(body, dict) else None
+        if not model or not isinstance(model, str):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="必须指定模型"
             )
         
         # 记录请求信息
-        logger.info(f"接收流式聊天请求: 模型={request.model}, 消息数量={len(request.messages)}")
+        # 消息字段尚未校验，只在其为列表时统计数量
+        messages = body.get("messages")
+        message_count = len(messages) if isinstance(messages, list) else 0
+        logger.info(f"接收流式聊天请求: 模型={model}, 消息数量={message_count}")
         
         # 生成会话ID用于跟踪此次对话
         session_id = f"stream_{int(time.time() * 1000)}"
         logger.info(f"开始新的流式会话: {session_id}")
         
-        # 确保请求是流式的
-        request.stream = True
-        
         # 简化流式处理：正确处理异步生成器
         async def generate_text_stream():
+            # 使用异步生成器，由服务层完成请求体校验
+            events = ai_manager.chat_stream_raw(body)
             try:
-                # 使用异步生成器，调用正确的chat_stream方法
-                async for event in ai_manager.chat_stream(request):
+                event_count = 0
+                async for event in events:
+                    event_count += 1
+                    if event_count % _DISCONNECT_CHECK_INTERVAL == 0 and await req.is_disconnected():
+                        logger.info(f"客户端已断开，停止流式会话 {session_id}")
+                        break
+
                     if event.type == "content":
                         # 提取内容数据
                         content = event.data.get("content", "")
                         if content:
-                            yield content
+                            yield content.encode("utf-8")
                     elif event.type == "thinking":
                         # 处理思考内容 - 发送 SSE 格式的思考事件
                         thinking = event.data.get("thinking", "")
                         if thinking:
-                            import json
                             # 发送JSON格式的思考事件给前端
-                            thinking_event = json.dumps({
-                                "type": "thinking",
-                                "data": {"thinking": thinking}
-                            }, ensure_ascii=False)
-                            yield f"data: {thinking_event}\n\n"
+                            yield encode_thinking(thinking)
                     elif event.type == "error":
                         error_msg = event.data.get("error", "未知错误")
                         logger.error(f"流式生成内容时出错: {error_msg}")
-                        yield f"错误: {error_msg}"
+                        yield encode_text_error(error_msg)
                         break
                     elif event.type == "done":
                         # 流式响应结束
@@ -197,14 +189,16 @@ async def chat_stream(
 
             except Exception as e:
                 logger.error(f"流式生成内容时出错: {e}")
-                yield f"错误: {str(e)}"
+                yield encode_text_error(str(e))
+            finally:
+                # 关闭上游生成器，释放到模型API的HTTP流
+                await events.aclose()
         
         # 返回文本流响应
-        return StreamingResponse(
-            generate_text_stream(),
-            media_type="text/event-stream",
-        )
-                
+        return RawSSEResponse(generate_text_stream())
+
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"处理流式聊天请求时出错: {str(e)}")
         raise HTTPException(
@@ -219,18 +213,22 @@ async def debug_request_format(
 ):
     """调试API - 回显请求格式，帮助排查格式问题"""
     try:
-        # 尝试验证请求格式
-        messages = []
-        for msg_data in raw_request.get("messages", []):
-            try:
-                # 尝试创建消息对象
-                msg = Message(**msg_data)
-                messages.append(msg.dict())
-            except ValidationError as e:
-                messages.append({
-                    "original": msg_data,
-                    "errors": str(e)
-                })
+        # 尝试一次性验证整个消息列表
+        raw_messages = raw_request.get("messages", [])
+        try:
+            messages = [msg.dict() for msg in _MESSAGE_LIST_ADAPTER.validate_python(raw_messages)]
+        except ValidationError:
+            # 批量验证失败时逐条验证，定位具体出错的消息
+            messages = []
+            for msg_data in raw_messages:
+                try:
+                    msg = Message(**msg_data)
+                    messages.append(msg.dict())
+                except ValidationError as e:
+                    messages.append({
+                        "original": msg_data,
+                        "errors": str(e)
+                    })
         
         # 返回请求解析结果
         return {
@@ -250,8 +248,7 @@ async def check_deepseek_connection(
 ):
     """检查Deepseek API连接状态"""
     # 通过AI管理器检查Deepseek模型状态
-    deepseek_models = [model for model in ai_manager.get_available_models()
-                      if model.value.startswith('deepseek-')]
+    deepseek_models = ai_manager.get_deepseek_models()
 
     if not deepseek_models:
         return {
@@ -260,9 +257,28 @@ async def check_deepseek_connection(
             "models": []
         }
 
-    # 检查第一个Deepseek模型的连接状态
-    model_id = deepseek_models[0].value
-    is_connected, message = await ai_manager.check_model_status(model_id)
+    # 并发检查所有Deepseek模型，任一连接成功即返回并取消其余检查
+    tasks = [
+        asyncio.ensure_future(ai_manager.check_model_status(model.value))
+        for model in deepseek_models
+    ]
+    is_connected = False
+    failure_messages = []
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            is_connected, message = await next_done
+            if is_connected:
+                break
+            failure_messages.append(message)
+    finally:
+        for task in tasks:
+            task.cancel()
+        # 等待被取消的检查真正结束，及时释放其协程帧
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    if not is_connected:
+        # 去重后汇总所有失败原因
+        message = "; ".join(dict.fromkeys(failure_messages))
 
     return {
         "connected": is_connected,
@@ -272,6 +288,7 @@ async def check_deepseek_connection(
 
 @router.post("/deepseek/generate")
 async def generate_text(
+    req: Request,
     messages: List[Dict[str, str]] = Body(..., description="消息列表，格式为[{\"role\": \"user\", \"content\": \"内容\"}]", embed=True),
     max_tokens: int = Body(2048, description="最大生成令牌数"),
     temperature: float = Body(0.7, description="生成文本的随机性"),
@@ -281,11 +298,11 @@ async def generate_text(
 ):
     """使用AI Manager调用Deepseek生成文本"""
     try:
-        # 将字典消息转换为Message对象
-        message_objects = [
-            Message(role=msg.get("role", "user"), content=msg.get("content", ""))
+        # 将字典消息转换为Message对象，整个列表交给预先构建的校验器一次完成角色和内容校验
+        message_objects = _MESSAGE_LIST_ADAPTER.validate_python([
+            {"role": msg.get("role", "user"), "content": msg.get("content", "")}
             for msg in messages
-        ]
+        ])
 
         # 创建ChatRequest
         request = ChatRequest(
@@ -299,23 +316,32 @@ async def generate_text(
         if stream:
             # 使用流式响应
             async def generate_stream():
+                events = ai_manager.chat_stream(request)
                 try:
-                    async for event in ai_manager.chat_stream(request):
+                    event_count = 0
+                    async for event in events:
+                        event_count += 1
+                        if event_count % _DISCONNECT_CHECK_INTERVAL == 0 and await req.is_disconnected():
+                            logger.info("客户端已断开，停止Deepseek流式生成")
+                            break
+
                         if event.type == "content":
                             content = event.data.get("content", "")
                             if content:
-                                yield f"data: {json.dumps({'content': content})}\n\n"
+                                yield encode_content(content)
                         elif event.type == "done":
-                            yield f"data: {json.dumps({'done': True})}\n\n"
+                            yield SSE_DONE
                             break
                         elif event.type == "error":
                             error_msg = event.data.get("error", "未知错误")
-                            yield f"data: {json.dumps({'error': error_msg})}\n\n"
+                            yield encode_error(error_msg)
                             break
                 except Exception as e:
-                    yield f"data: {json.dumps({'error': str(e)})}\n\n"
+                    yield encode_error(str(e))
+                finally:
+                    await events.aclose()
 
-            return StreamingResponse(generate_stream(), media_type="text/event-stream")
+            return RawSSEResponse(generate_stream())
         else:
             # 非流式响应
             response = await ai_manager.chat(request)
@@ -341,7 +367,9 @@ async def analyze_network_log(
     deepseek_service: DeepseekService = Depends(get_deepseek_service)
 ):
     """使用Deepseek分析网络日志"""
-    return StreamingResponse(
-        deepseek_service.analyze_network_log(log_content, query, model),
-        media_type="text/event-stream"
-    ) 
\ No newline at end of file
+    # 分析服务产出的是事件字典，在异步生成器内直接编码为SSE字节帧
+    async def generate_analysis_stream():
+        async for event in deepseek_service.analyze_network_log(log_content, query, model):
+            yield encode_data(event)
+
+    return RawSSEResponse(generate_analysis_stream()) 
\ No newline at end of file
@@ -1,3 +1,5 @@
+import asyncio
+
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
 from typing import Dict, Any
@@ -23,12 +25,12 @@ async def health_check(
     ai_status = "available" if ai_manager else "unavailable"
     network_status = "available" if network_service else "unavailable"
 
-    # 统计连接数
-    connections = await network_service.get_connections()
+    # 并发统计连接数并检查AI模型可用性
+    connections, models = await asyncio.gather(
+        network_service.get_connections(),
+        ai_manager.get_models_response()
+    )
     connection_count = len(connections.connections)
-
-    # 检查AI模型可用性
-    models = await ai_manager.get_models_response()
     model_count = len(models.models)
 
     return HealthResponse(
@@ -1,42 +1,117 @@
-from typing import Generator
+import asyncio
+import time
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
 
-from fastapi import Depends
+from fastapi import HTTPException, Request, status
 
-from app.services.ai.manager import AIServiceManager, ai_service_manager
-from app.services.network_service import NetworkService
-from app.services.terminal_service import TerminalService
-from app.services.deepseek_service import DeepseekService
 from app.config.settings import settings
+from app.utils.logger import get_logger
 
-# 全局服务实例
-_network_service = None
-_terminal_service = None
-_deepseek_service = None
+# 服务模块在各自的获取函数中按需导入，保持导入本模块的开销很小
+if TYPE_CHECKING:
+    from app.services.ai.manager import AIServiceManager
+    from app.services.network_service import NetworkService
+    from app.services.terminal_service import TerminalService
+    from app.services.deepseek_service import DeepseekService
 
-def get_deepseek_service() -> DeepseekService:
+logger = get_logger(__name__)
+
+class _DisabledDeepseekService:
+    """DEEPSEEK_API_ENABLED为false时使用的轻量替身，不创建HTTP客户端"""
+
+    def is_enabled(self) -> bool:
+        return False
+
+    async def analyze_network_log(self, log_content: str, query: Optional[str] = None,
+                                  model: str = "deepseek-chat"):
+        yield {"type": "error", "data": {"error": "Deepseek服务未启用"}}
+
+    def __getattr__(self, name):
+        raise RuntimeError("DEEPSEEK_API_ENABLED=false")
+
+
+_DISABLED_DEEPSEEK_SERVICE = _DisabledDeepseekService()
+
+
+# 服务单例及其初始化锁（双重检查锁定，保证并发请求下只构造一次）
+_deepseek_service: Optional["DeepseekService"] = None
+_network_service: Optional["NetworkService"] = None
+_terminal_service: Optional["TerminalService"] = None
+
+# Deepseek服务初始化失败后的冷却时间（秒）：期间直接返回503，到期后再重新尝试构造
+_DEEPSEEK_RETRY_INTERVAL = 30
+# 最近一次初始化失败：(异常, 允许重试的time.monotonic()时间)
+_deepseek_failure: Optional[Tuple[Exception, float]] = None
+
+# 锁在首次使用时于运行中的事件循环内创建：Python 3.9的asyncio.Lock在构造时绑定当前事件循环，
+# 导入时创建会绑定到错误的循环
+_init_locks: Dict[str, asyncio.Lock] = {}
+
+def _init_lock(name: str) -> asyncio.Lock:
+    """获取指定服务的初始化锁（创建过程中没有await，不会并发重复创建）"""
+    lock = _init_locks.get(name)
+    if lock is None:
+        lock = _init_locks[name] = asyncio.Lock()
+    return lock
+
+def _deepseek_unavailable() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Deepseek服务不可用"
+    )
+
+def _raise_if_deepseek_failed() -> None:
+    """初始化失败且仍在冷却期内时直接抛出503，不重复执行失败的构造"""
+    if _deepseek_failure is not None and time.monotonic() < _deepseek_failure[1]:
+        raise _deepseek_unavailable() from _deepseek_failure[0]
+
+async def get_deepseek_service(request: Request) -> "DeepseekService":
     """获取Deepseek服务实例"""
-    global _deepseek_service
-    if _deepseek_service is None and settings.DEEPSEEK_API_ENABLED:
-        _deepseek_service = DeepseekService()
-    elif _deepseek_service is None:
-        # 如果服务未启用，仍返回实例但功能受限
-        _deepseek_service = DeepseekService()
+    global _deepseek_service, _deepseek_failure
+    if not settings.DEEPSEEK_API_ENABLED:
+        return _DISABLED_DEEPSEEK_SERVICE
+    if _deepseek_service is not None:
+        return _deepseek_service
+    _raise_if_deepseek_failed()
+    async with _init_lock("deepseek"):
+        if _deepseek_service is None:
+            # 等锁期间其他请求可能刚刚初始化失败
+            _raise_if_deepseek_failed()
+            try:
+                from app.services.deepseek_service import DeepseekService
+                _deepseek_service = DeepseekService(
+                    http_client=getattr(request.app.state, "http_client", None)
+                )
+            except Exception as e:
+                # 失败结果只缓存_DEEPSEEK_RETRY_INTERVAL秒，配置修复后无需重启即可恢复
+                logger.error(f"Deepseek服务初始化失败: {str(e)}")
+                _deepseek_failure = (e, time.monotonic() + _DEEPSEEK_RETRY_INTERVAL)
+                raise _deepseek_unavailable() from e
+            _deepseek_failure = None
     return _deepseek_service
 
-def get_ai_service_manager() -> AIServiceManager:
-    """获取AI服务管理器实例"""
-    return ai_service_manager
+async def get_ai_service_manager(request: Request) -> "AIServiceManager":
+    """获取AI服务管理器实例（应用启动时创建并挂载在app.state上）"""
+    return request.app.state.ai_manager
 
-def get_network_service() -> NetworkService:
+async def get_network_service() -> "NetworkService":
     """获取网络服务实例"""
     global _network_service
-    if _network_service is None:
-        _network_service = NetworkService()
+    if _network_service is not None:
+        return _network_service
+    async with _init_lock("network"):
+        if _network_service is None:
+            from app.services.network_service import NetworkService
+            _network_service = NetworkService()
     return _network_service
 
-def get_terminal_service() -> TerminalService:
+async def get_terminal_service() -> "TerminalService":
     """获取终端服务实例"""
     global _terminal_service
-    if _terminal_service is None:
-        _terminal_service = TerminalService()
-    return _terminal_service 
\ No newline at end of file
+    if _terminal_service is not None:
+        return _terminal_service
+    async with _init_lock("terminal"):
+        if _terminal_service is None:
+            from app.services.terminal_service import TerminalService
+            _terminal_service = TerminalService()
+    return _terminal_service
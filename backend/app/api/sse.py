@@ -0,0 +1,86 @@
+"""
+SSE编码工具
+流式接口共用的Server-Sent Events帧编码函数
+"""
+
+from typing import Any
+
+import msgspec
+import orjson
+from starlette.responses import StreamingResponse
+from starlette.types import Send
+
+# SSE帧的固定前后缀，预先编码避免每个数据块重复编码
+SSE_PREFIX = b"data: "
+SSE_SUFFIX = b"\n\n"
+
+# 常用的终止帧在模块加载时预先序列化
+SSE_DONE = SSE_PREFIX + orjson.dumps({"done": True}) + SSE_SUFFIX
+SSE_ERROR_TMPL = SSE_PREFIX + b'{"error":%b}' + SSE_SUFFIX
+
+
+class ThinkingData(msgspec.Struct):
+    """思考事件数据"""
+    thinking: str
+
+
+class ThinkingEvent(msgspec.Struct, kw_only=True):
+    """思考事件，序列化为 {"type": "thinking", "data": {"thinking": ...}}"""
+    type: str = "thinking"
+    data: ThinkingData
+
+
+class ContentFrame(msgspec.Struct):
+    """内容帧，序列化为 {"content": ...}"""
+    content: str
+
+
+# 按结构体类型直接编码为bytes，复用同一个编码器
+_encoder = msgspec.json.Encoder()
+
+
+def encode_data(data: Any) -> bytes:
+    """将数据编码为 `data: <json>` 形式的SSE字节帧"""
+    return SSE_PREFIX + orjson.dumps(data) + SSE_SUFFIX
+
+
+def encode_thinking(thinking: str) -> bytes:
+    """将思考内容编码为SSE字节帧"""
+    return SSE_PREFIX + _encoder.encode(ThinkingEvent(data=ThinkingData(thinking))) + SSE_SUFFIX
+
+
+def encode_content(content: str) -> bytes:
+    """将内容片段编码为SSE字节帧"""
+    return SSE_PREFIX + _encoder.encode(ContentFrame(content)) + SSE_SUFFIX
+
+
+def encode_error(error_msg: str) -> bytes:
+    """将错误消息编码为 `data: {"error": ...}` 形式的SSE字节帧"""
+    return SSE_ERROR_TMPL % orjson.dumps(error_msg)
+
+
+def encode_text_error(error_msg: str) -> bytes:
+    """将错误消息编码为纯文本流使用的 `错误: ...` 字节块"""
+    return f"错误: {error_msg}".encode()
+
+
+class RawSSEResponse(StreamingResponse):
+    """直接发送字节块的流式响应
+
+    要求body_iterator只产出bytes，省去StreamingResponse对每个数据块的类型判断和编码
+    """
+
+    media_type = "text/event-stream"
+
+    async def stream_response(self, send: Send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+        async for chunk in self.body_iterator:
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
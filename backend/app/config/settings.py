@@ -1,129 +1,116 @@
 import os
-from pydantic_settings import BaseSettings
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, ClassVar, List, Tuple
 
-class Settings(BaseSettings):
+import msgspec
+from dotenv import dotenv_values
+
+class Settings(msgspec.Struct, frozen=True):
     """应用配置"""
     # 应用设置
-    APP_ENV: Optional[str] = os.getenv("APP_ENV")
-    DEBUG: bool = os.getenv("DEBUG", "false").lower() == "true"
-    API_PREFIX: Optional[str] = os.getenv("API_PREFIX")
-    API_V1_STR: Optional[str] = os.getenv("API_V1_STR")
-    PROJECT_NAME: Optional[str] = os.getenv("APP_NAME")
-    APP_VERSION: Optional[str] = os.getenv("APP_VERSION")
+    APP_ENV: Optional[str] = None
+    DEBUG: bool = False
+    API_PREFIX: Optional[str] = None
+    API_V1_STR: Optional[str] = None
+    PROJECT_NAME: Optional[str] = None  # 环境变量 APP_NAME
+    APP_VERSION: Optional[str] = None
     
     # CORS设置
-    BACKEND_CORS_ORIGINS: List[str] = os.getenv("CORS_ORIGINS", "").split(",") if os.getenv("CORS_ORIGINS") else []
+    BACKEND_CORS_ORIGINS: Tuple[str, ...] = ()  # 环境变量 CORS_ORIGINS，逗号分隔或JSON数组
     
     # 安全设置
-    SECRET_KEY: Optional[str] = os.getenv("SECRET_KEY")
-    JWT_ALGORITHM: Optional[str] = os.getenv("JWT_ALGORITHM")
-    JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", "0"))
+    SECRET_KEY: Optional[str] = None
+    JWT_ALGORITHM: Optional[str] = None
+    JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 0
     
     # 服务器设置
-    HOST: Optional[str] = os.getenv("HOST")
-    PORT: int = int(os.getenv("PORT", "0"))
+    HOST: Optional[str] = None
+    PORT: int = 0
     
     # 会话设置
-    SESSION_IDLE_TIMEOUT: int = int(os.getenv("SESSION_IDLE_TIMEOUT", "0"))
-    MAX_TERMINAL_SESSIONS: int = int(os.getenv("MAX_TERMINAL_SESSIONS", "0"))
+    SESSION_IDLE_TIMEOUT: int = 0
+    MAX_TERMINAL_SESSIONS: int = 0
+    TELNET_POOL_MAX_SIZE: int = 100  # Telnet连接池最多保留的空闲连接数
+    TELNET_POOL_IDLE_TIMEOUT: int = 300  # 池中空闲连接的保留时间(秒)
+    SESSION_STORE_MAX_SIZE: int = 256  # 终端会话表最多保持的会话数，超出时淘汰最冷的会话
     
     # 日志设置
-    LOG_LEVEL: Optional[str] = os.getenv("LOG_LEVEL")
-    LOG_FORMAT: Optional[str] = os.getenv("LOG_FORMAT")
+    LOG_LEVEL: Optional[str] = None
+    LOG_FORMAT: Optional[str] = None
     
     # AI设置
-    AI_ENABLED: bool = os.getenv("AI_ENABLED", "false").lower() == "true"
+    AI_ENABLED: bool = False
     
     # API密钥 - Anthropic (Claude)
-    ANTHROPIC_API_KEY: Optional[str] = os.getenv("ANTHROPIC_API_KEY")
-    ANTHROPIC_API_BASE: Optional[str] = os.getenv("ANTHROPIC_API_BASE")
-    CLAUDE_MODEL_VERSION: Optional[str] = os.getenv("CLAUDE_MODEL_VERSION")
+    ANTHROPIC_API_KEY: Optional[str] = None
+    ANTHROPIC_API_BASE: Optional[str] = None
+    CLAUDE_MODEL_VERSION: Optional[str] = None
     
     # API密钥 - OpenAI (GPT)
-    OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
-    OPENAI_API_BASE: Optional[str] = os.getenv("OPENAI_API_BASE")
+    OPENAI_API_KEY: Optional[str] = None
+    OPENAI_API_BASE: Optional[str] = None
     
     # API密钥 - Deepseek
-    DEEPSEEK_API_ENABLED: bool = os.getenv("DEEPSEEK_API_ENABLED", "false").lower() == "true"
-    DEEPSEEK_API_KEY: Optional[str] = os.getenv("DEEPSEEK_API_KEY")
-    DEEPSEEK_API_URL: Optional[str] = os.getenv("DEEPSEEK_API_URL")
-    DEEPSEEK_MODEL_VERSION: Optional[str] = os.getenv("DEEPSEEK_MODEL_VERSION")
-    DEEPSEEK_TIMEOUT: int = int(os.getenv("DEEPSEEK_TIMEOUT", "0"))
-    DEEPSEEK_MAX_TOKENS: int = int(os.getenv("DEEPSEEK_MAX_TOKENS", "0"))
+    DEEPSEEK_API_ENABLED: bool = False
+    DEEPSEEK_API_KEY: Optional[str] = None
+    DEEPSEEK_API_URL: Optional[str] = None
+    DEEPSEEK_MODEL_VERSION: Optional[str] = None
+    DEEPSEEK_TIMEOUT: int = 0
+    DEEPSEEK_MAX_TOKENS: int = 0
     
     # 模型列表配置
-    OPENAI_MODELS: Optional[str] = os.getenv("OPENAI_MODELS")
-    OPENAI_MODEL_NAMES: Optional[str] = os.getenv("OPENAI_MODEL_NAMES")
-    OPENAI_MODEL_DESCRIPTIONS: Optional[str] = os.getenv("OPENAI_MODEL_DESCRIPTIONS")
-    OPENAI_MODEL_MAX_TOKENS: Optional[str] = os.getenv("OPENAI_MODEL_MAX_TOKENS")
+    OPENAI_MODELS: Optional[str] = None
+    OPENAI_MODEL_NAMES: Optional[str] = None
+    OPENAI_MODEL_DESCRIPTIONS: Optional[str] = None
+    OPENAI_MODEL_MAX_TOKENS: Optional[str] = None
     
-    CLAUDE_MODELS: Optional[str] = os.getenv("CLAUDE_MODELS")
-    CLAUDE_MODEL_NAMES: Optional[str] = os.getenv("CLAUDE_MODEL_NAMES")
-    CLAUDE_MODEL_DESCRIPTIONS: Optional[str] = os.getenv("CLAUDE_MODEL_DESCRIPTIONS")
-    CLAUDE_MODEL_MAX_TOKENS: Optional[str] = os.getenv("CLAUDE_MODEL_MAX_TOKENS")
+    CLAUDE_MODELS: Optional[str] = None
+    CLAUDE_MODEL_NAMES: Optional[str] = None
+    CLAUDE_MODEL_DESCRIPTIONS: Optional[str] = None
+    CLAUDE_MODEL_MAX_TOKENS: Optional[str] = None
 
     # Deepseek模型列表配置
-    DEEPSEEK_MODELS: Optional[str] = os.getenv("DEEPSEEK_MODELS")
-    DEEPSEEK_MODEL_NAMES: Optional[str] = os.getenv("DEEPSEEK_MODEL_NAMES")
-    DEEPSEEK_MODEL_DESCRIPTIONS: Optional[str] = os.getenv("DEEPSEEK_MODEL_DESCRIPTIONS")
-    DEEPSEEK_MODEL_MAX_TOKENS: Optional[str] = os.getenv("DEEPSEEK_MODEL_MAX_TOKENS")
-
-    model_config = {
-        "env_file": ".env",
-        "case_sensitive": True,
-        "extra": "allow"
-    }
-
-    def model_post_init(self, __context: Any) -> None:  # type: ignore[override]
-        """验证必需配置项并规范化配置"""
-        # 验证必需的基础配置项
+    DEEPSEEK_MODELS: Optional[str] = None
+    DEEPSEEK_MODEL_NAMES: Optional[str] = None
+    DEEPSEEK_MODEL_DESCRIPTIONS: Optional[str] = None
+    DEEPSEEK_MODEL_MAX_TOKENS: Optional[str] = None
+
+    # 必需配置项的字段名，验证时按名称读取
+    _REQUIRED_BASIC: ClassVar[Tuple[str, ...]] = (
+        "APP_ENV", "API_PREFIX", "PROJECT_NAME", "APP_VERSION", "SECRET_KEY",
+        "JWT_ALGORITHM", "HOST", "LOG_LEVEL", "LOG_FORMAT",
+    )
+    # 规范化后允许为空字符串的必需项（API_PREFIX="/"表示挂载在根路径），只要求已配置
+    _REQUIRED_ALLOW_EMPTY: ClassVar[Tuple[str, ...]] = ("API_PREFIX",)
+    _REQUIRED_NUMERIC: ClassVar[Tuple[str, ...]] = (
+        "PORT", "JWT_ACCESS_TOKEN_EXPIRE_MINUTES", "SESSION_IDLE_TIMEOUT", "MAX_TERMINAL_SESSIONS",
+    )
+    # AI配置检查表：(错误分类, 字段名)
+    _AI_CHECKS: ClassVar[Tuple[Tuple[str, str], ...]] = (
+        ("basic", "ANTHROPIC_API_BASE"), ("basic", "OPENAI_API_BASE"), ("basic", "DEEPSEEK_API_URL"),
+        ("model", "CLAUDE_MODEL_VERSION"), ("model", "DEEPSEEK_MODEL_VERSION"),
+        ("model", "OPENAI_MODELS"), ("model", "OPENAI_MODEL_NAMES"),
+        ("model", "OPENAI_MODEL_DESCRIPTIONS"), ("model", "OPENAI_MODEL_MAX_TOKENS"),
+        ("model", "CLAUDE_MODELS"), ("model", "CLAUDE_MODEL_NAMES"),
+        ("model", "CLAUDE_MODEL_DESCRIPTIONS"), ("model", "CLAUDE_MODEL_MAX_TOKENS"),
+        ("model", "DEEPSEEK_MODELS"), ("model", "DEEPSEEK_MODEL_NAMES"),
+        ("model", "DEEPSEEK_MODEL_DESCRIPTIONS"), ("model", "DEEPSEEK_MODEL_MAX_TOKENS"),
+    )
+    _REQUIRED_AI_NUMERIC: ClassVar[Tuple[str, ...]] = ("DEEPSEEK_TIMEOUT", "DEEPSEEK_MAX_TOKENS")
+
+    def __post_init__(self) -> None:
+        """验证必需配置项"""
         self._validate_required_config()
-
-        # 规范化 API_PREFIX：确保以 / 开头、无结尾 /
-        prefix = (self.API_PREFIX or "/api").strip()
-        if not prefix.startswith("/"):
-            prefix = "/" + prefix
-        prefix = prefix.rstrip("/")
-        self.API_PREFIX = prefix
-
-        # 若未通过环境变量显式提供 API_V1_STR，则按前缀计算 /v1
-        if os.getenv("API_V1_STR") is None:
-            self.API_V1_STR = f"{self.API_PREFIX}/v1"
-
-        # 验证必需的AI配置项
         self._validate_ai_config()
 
     def _validate_required_config(self) -> None:
         """验证必需的基础配置项"""
-        required_configs = [
-            ("APP_ENV", self.APP_ENV),
-            ("API_PREFIX", self.API_PREFIX),
-            ("APP_NAME", self.PROJECT_NAME),
-            ("APP_VERSION", self.APP_VERSION),
-            ("SECRET_KEY", self.SECRET_KEY),
-            ("JWT_ALGORITHM", self.JWT_ALGORITHM),
-            ("HOST", self.HOST),
-            ("LOG_LEVEL", self.LOG_LEVEL),
-            ("LOG_FORMAT", self.LOG_FORMAT),
+        missing_configs = [
+            _ENV_ALIASES.get(name, name) for name in self._REQUIRED_BASIC
+            if getattr(self, name) is None
+            or (not getattr(self, name) and name not in self._REQUIRED_ALLOW_EMPTY)
         ]
-
-        missing_configs = []
-        zero_configs = []
-
-        for config_name, config_value in required_configs:
-            if not config_value:
-                missing_configs.append(config_name)
-
         # 检查数值型配置是否为0（可能未设置）
-        if self.PORT == 0:
-            zero_configs.append("PORT")
-        if self.JWT_ACCESS_TOKEN_EXPIRE_MINUTES == 0:
-            zero_configs.append("JWT_ACCESS_TOKEN_EXPIRE_MINUTES")
-        if self.SESSION_IDLE_TIMEOUT == 0:
-            zero_configs.append("SESSION_IDLE_TIMEOUT")
-        if self.MAX_TERMINAL_SESSIONS == 0:
-            zero_configs.append("MAX_TERMINAL_SESSIONS")
+        zero_configs = [name for name in self._REQUIRED_NUMERIC if getattr(self, name) == 0]
 
         error_messages = []
         if missing_configs:
@@ -142,50 +129,13 @@ class Settings(BaseSettings):
         if not self.AI_ENABLED:
             return
 
-        # 验证基础AI配置项
-        basic_ai_configs = [
-            ("ANTHROPIC_API_BASE", self.ANTHROPIC_API_BASE),
-            ("OPENAI_API_BASE", self.OPENAI_API_BASE),
-            ("DEEPSEEK_API_URL", self.DEEPSEEK_API_URL),
-        ]
-
-        # 验证Deepseek数值配置
-        deepseek_numeric_configs = []
-        if self.DEEPSEEK_TIMEOUT == 0:
-            deepseek_numeric_configs.append("DEEPSEEK_TIMEOUT")
-        if self.DEEPSEEK_MAX_TOKENS == 0:
-            deepseek_numeric_configs.append("DEEPSEEK_MAX_TOKENS")
-
-        # 验证必需的配置项
-        required_configs = [
-            ("CLAUDE_MODEL_VERSION", self.CLAUDE_MODEL_VERSION),
-            ("DEEPSEEK_MODEL_VERSION", self.DEEPSEEK_MODEL_VERSION),
-            ("OPENAI_MODELS", self.OPENAI_MODELS),
-            ("OPENAI_MODEL_NAMES", self.OPENAI_MODEL_NAMES),
-            ("OPENAI_MODEL_DESCRIPTIONS", self.OPENAI_MODEL_DESCRIPTIONS),
-            ("OPENAI_MODEL_MAX_TOKENS", self.OPENAI_MODEL_MAX_TOKENS),
-            ("CLAUDE_MODELS", self.CLAUDE_MODELS),
-            ("CLAUDE_MODEL_NAMES", self.CLAUDE_MODEL_NAMES),
-            ("CLAUDE_MODEL_DESCRIPTIONS", self.CLAUDE_MODEL_DESCRIPTIONS),
-            ("CLAUDE_MODEL_MAX_TOKENS", self.CLAUDE_MODEL_MAX_TOKENS),
-            ("DEEPSEEK_MODELS", self.DEEPSEEK_MODELS),
-            ("DEEPSEEK_MODEL_NAMES", self.DEEPSEEK_MODEL_NAMES),
-            ("DEEPSEEK_MODEL_DESCRIPTIONS", self.DEEPSEEK_MODEL_DESCRIPTIONS),
-            ("DEEPSEEK_MODEL_MAX_TOKENS", self.DEEPSEEK_MODEL_MAX_TOKENS),
-        ]
-
-        missing_configs = []
-        missing_basic_configs = []
-
-        # 检查基础AI配置
-        for config_name, config_value in basic_ai_configs:
-            if not config_value:
-                missing_basic_configs.append(config_name)
-
-        # 检查模型配置
-        for config_name, config_value in required_configs:
-            if not config_value:
-                missing_configs.append(config_name)
+        missing: Dict[str, List[str]] = {"basic": [], "model": []}
+        for kind, name in self._AI_CHECKS:
+            if not getattr(self, name):
+                missing[kind].append(name)
+        missing_basic_configs = missing["basic"]
+        missing_configs = missing["model"]
+        deepseek_numeric_configs = [name for name in self._REQUIRED_AI_NUMERIC if getattr(self, name) == 0]
 
         error_messages = []
         if missing_basic_configs:
@@ -201,5 +151,68 @@ class Settings(BaseSettings):
                 f"\n请检查.env文件并确保所有必需的AI配置项都已正确设置。"
             )
 
+# 字段名与环境变量名不一致的配置项
+_ENV_ALIASES = {
+    "PROJECT_NAME": "APP_NAME",
+    "BACKEND_CORS_ORIGINS": "CORS_ORIGINS",
+}
+
+
+_BOOL_TRUE = frozenset({"true", "1", "yes", "on", "y", "t"})
+
+
+def _bool(value: str) -> bool:
+    return value.strip().lower() in _BOOL_TRUE
+
+
+def _parse_cors_origins(value: str) -> Tuple[str, ...]:
+    """解析CORS来源列表，支持逗号分隔字符串或JSON数组"""
+    if value.startswith("["):
+        return tuple(msgspec.json.decode(value, type=List[str]))
+    return tuple(origin.strip() for origin in value.split(",") if origin.strip())
+
+
+def _load_settings(env_file: str = ".env") -> Settings:
+    """从环境变量和.env文件读取配置（环境变量优先）并构造Settings"""
+    # 一次性合并出环境快照，后续只做字典查找
+    raw = {**dotenv_values(env_file), **os.environ}
+
+    values: Dict[str, Any] = {}
+    for field in msgspec.structs.fields(Settings):
+        value = raw.get(_ENV_ALIASES.get(field.name, field.name))
+        if value is None:
+            continue
+        if field.type is bool:
+            values[field.name] = _bool(value)
+        elif field.name == "BACKEND_CORS_ORIGINS":
+            values[field.name] = _parse_cors_origins(value)
+        else:
+            values[field.name] = value
+
+    # 规范化 API_PREFIX：确保以 / 开头、无结尾 /
+    prefix = values.get("API_PREFIX")
+    if prefix is not None:
+        prefix = prefix.strip()
+        if not prefix:
+            # 空值视为未配置，由必需配置项验证报错
+            del values["API_PREFIX"]
+        else:
+            prefix = prefix.strip("/")
+            # 只有"/"时规范化为空前缀（挂载在根路径），避免拼出"//v1"
+            values["API_PREFIX"] = "/" + prefix if prefix else ""
+
+            # 若未显式提供 API_V1_STR，则按前缀计算 /v1
+            if raw.get("API_V1_STR") is None:
+                values["API_V1_STR"] = f"{values['API_PREFIX']}/v1"
+
+    # 数值字段在宽松模式下由字符串转换；转换失败和__post_init__中的验证失败均由msgspec包装为
+    # ValidationError，这里统一以ValueError抛出，配置错误导致启动失败时不暴露msgspec的异常类型
+    try:
+        return msgspec.convert(values, Settings, strict=False)
+    except msgspec.ValidationError as e:
+        raise ValueError(str(e)) from None
+
+
 # 创建全局设置实例
-settings = Settings() 
+settings = _load_settings()
+
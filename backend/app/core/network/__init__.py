@@ -2,8 +2,15 @@
 网络连接核心模块
 """
 
+import importlib
+
 from .base import NetworkConnection, DeviceType, ConnectionStatus
-from .telnet import telnet_manager, TelnetManager
+
+# Telnet相关对象在首次访问时才导入，避免只用到基础类型时加载整套Telnet实现
+_LAZY = {
+    'telnet_manager': '.telnet',
+    'TelnetManager': '.telnet',
+}
 
 __all__ = [
     'NetworkConnection',
@@ -11,4 +18,17 @@ __all__ = [
     'ConnectionStatus',
     'telnet_manager',
     'TelnetManager'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        module = importlib.import_module(_LAZY[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
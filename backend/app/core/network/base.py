@@ -6,10 +6,11 @@
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional, Tuple
 from enum import Enum
-import uuid
+from secrets import token_hex
+import time
 
 
-class DeviceType(Enum):
+class DeviceType(str, Enum):
     """设备类型枚举"""
     UNKNOWN = "unknown"
     HUAWEI = "huawei"
@@ -18,7 +19,7 @@ class DeviceType(Enum):
     H3C = "h3c"
 
 
-class ConnectionStatus(Enum):
+class ConnectionStatus(str, Enum):
     """连接状态枚举"""
     DISCONNECTED = "disconnected"
     CONNECTING = "connecting"
@@ -28,18 +29,61 @@ class ConnectionStatus(Enum):
 
 class NetworkConnection(ABC):
     """网络连接基类"""
+
+    # 每个终端会话一个实例，使用__slots__省去实例__dict__
+    __slots__ = (
+        "host", "port", "username", "password", "session_id",
+        "_status", "_status_value", "_device_type", "_device_type_value",
+        "client", "connection_time", "last_activity_time", "_info_template",
+    )
     
     def __init__(self, host: str, port: int, username: str, password: str):
         self.host = host
         self.port = port
         self.username = username
         self.password = password
-        self.session_id = str(uuid.uuid4())
+        self.session_id = token_hex(16)
         self.status = ConnectionStatus.DISCONNECTED
         self.device_type = DeviceType.UNKNOWN
         self.client = None
         self.connection_time = None
         self.last_activity_time = None
+        # 创建后不再变化的字段，get_info时直接复用
+        self._info_template = {
+            "session_id": self.session_id,
+            "host": self.host,
+            "port": self.port,
+            "username": self.username,
+        }
+
+    @property
+    def status(self) -> ConnectionStatus:
+        return self._status
+
+    @status.setter
+    def status(self, value: ConnectionStatus) -> None:
+        self._status = value
+        self._status_value = value.value
+
+    def transition(self, new_status: ConnectionStatus) -> float:
+        """切换连接状态并同时记录活动时间，返回本次时间戳"""
+        self.status = new_status
+        self.last_activity_time = now = time.time()
+        return now
+
+    def renew_session_id(self) -> str:
+        """分配新的会话ID（连接复用给新会话时调用），同步更新get_info使用的字段模板"""
+        self.session_id = self._info_template["session_id"] = token_hex(16)
+        return self.session_id
+
+    @property
+    def device_type(self) -> DeviceType:
+        return self._device_type
+
+    @device_type.setter
+    def device_type(self, value: DeviceType) -> None:
+        self._device_type = value
+        self._device_type_value = value.value
     
     @abstractmethod
     async def connect(self, timeout: int = 30) -> Tuple[bool, str]:
@@ -64,12 +108,9 @@ class NetworkConnection(ABC):
     def get_info(self) -> Dict[str, Any]:
         """获取连接信息"""
         return {
-            "session_id": self.session_id,
-            "host": self.host,
-            "port": self.port,
-            "username": self.username,
-            "status": self.status.value,
-            "device_type": self.device_type.value,
+            **self._info_template,
+            "status": self._status_value,
+            "device_type": self._device_type_value,
             "connection_time": self.connection_time,
             "last_activity_time": self.last_activity_time
         }
\ No newline at end of file
@@ -3,15 +3,38 @@ Telnet网络连接模块
 提供统一的Telnet连接管理接口
 """
 
-from .manager import TelnetManager, telnet_manager
-from .connection import TelnetConnection
-from .devices.huawei import HuaweiTelnetConnection
-from .protocols import TelnetProtocol
+import importlib
+
+# 各实现模块在首次访问对应名称时才导入
+_LAZY = {
+    'TelnetManager': '.manager',
+    'telnet_manager': '.manager',
+    'TelnetConnection': '.connection',
+    'HuaweiTelnetConnection': '.devices.huawei',
+    'TelnetProtocol': '.protocols',
+    'TelnetConnectionPool': '.pool',
+    'telnet_pool': '.pool',
+}
 
 __all__ = [
     'TelnetManager',
     'telnet_manager', 
     'TelnetConnection',
     'HuaweiTelnetConnection',
-    'TelnetProtocol'
-]
\ No newline at end of file
+    'TelnetProtocol',
+    'TelnetConnectionPool',
+    'telnet_pool'
+]
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        module = importlib.import_module(_LAZY[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
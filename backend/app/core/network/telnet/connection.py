@@ -4,11 +4,11 @@ Telnet连接实现
 """
 
 import asyncio
-import telnetlib
+import re
 import socket
 import time
-import concurrent.futures
-from typing import Dict, Any, Optional, Tuple
+from collections import deque
+from typing import Dict, Any, Optional, Tuple, List, Deque
 
 from app.core.network.base import NetworkConnection, DeviceType, ConnectionStatus
 from app.core.network.telnet.protocols import TelnetProtocol
@@ -16,132 +16,315 @@ from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# 单次读取的最大字节数，与接收缓冲区一致，长输出时一次取走已缓冲的全部数据
+_READ_CHUNK_SIZE = 65536
+# 套接字接收缓冲区大小，减少长输出时的读取次数
+_SOCKET_RCVBUF = 65536
+# TCP keepalive参数（秒/次）：空闲60秒后开始探测，每15秒一次，连续3次无响应判定断开
+_KEEPALIVE_OPTIONS = tuple(
+    (getattr(socket, name), value)
+    for name, value in (("TCP_KEEPIDLE", 60), ("TCP_KEEPINTVL", 15), ("TCP_KEEPCNT", 3))
+    if hasattr(socket, name)  # 部分平台不支持单独设置
+)
+# 命令输出的空闲判定时间（秒）：超过该时间无新数据视为输出暂停
+_IDLE_READ_TIMEOUT = 0.5
+# 已有输出时连续空闲读取达到该次数即认为命令结束
+_MAX_IDLE_READS = 3
+# 判断命令完成时只检查响应末尾的字节数
+_COMPLETION_TAIL_SIZE = 256
+# 复用连接时确认设备提示符的最长等待时间（秒）
+_REUSE_PROMPT_TIMEOUT = 2
+# 记录最近几次会话的开始时间（连接池按LRU-K淘汰时使用）
+_SESSION_HISTORY_SIZE = 2
+
+# 常见的分页提示符，直接在原始字节上一次扫描匹配
+_PAGINATION_BYTES_RE = re.compile(
+    rb'---- More ----|--More--|-- More --|<--- More --->'
+    rb'|Press (?:any key|SPACE) to continue'
+)
+# 分页提示的最大长度，用于跨数据块匹配时回看
+_PAGINATION_MAX_LEN = 32
+
+# 清理命令响应使用的正则：换行符（第1组）统一为\n，分页提示和ANSI转义序列直接移除；
+# 只有分页提示不区分大小写，ANSI转义序列仍只匹配m和K结尾
+_CLEAN_RE = re.compile(
+    r'(\r\n?)'
+    r'|(?i:\x1b\[\d*m--More--\x1b\[\d*m'  # ANSI编码的More
+    r'|---- More ----|--More--|-- More --|<--- More --->'
+    r'|Press (?:any key|SPACE) to continue\n?)'
+    r'|\x1b\[[0-9;]*[mK]'
+)
+# 需要移除的控制字符（NUL、BEL、BS）
+_CTRL_CHARS_TABLE = dict.fromkeys((0x00, 0x07, 0x08))
+_BLANK_LINES_RE = re.compile(r'\n\s*\n\s*\n')
+
+
+def _clean_replacement(match: re.Match) -> str:
+    """_CLEAN_RE的替换函数：换行符统一为\\n，其余匹配内容移除"""
+    return '\n' if match.group(1) else ''
+
 
 class TelnetConnection(NetworkConnection):
     """Telnet连接实现类"""
 
+    # 常见提示符结尾字符，设备子类可按需覆盖
+    _COMMON_PROMPTS = (b'#', b'>', b'$', b']')
+    _COMMON_PROMPTS_STR = ('#', '>', '$', ']')
+    # 登录后等待输出的结束标记：提示符，或再次出现的用户名/密码提示
+    _LOGIN_WAIT_SUFFIXES = _COMMON_PROMPTS + (b':',)
+    # 归还连接池前退回会话初始视图的命令，设备子类按需覆盖；
+    # 未知设备不发送任何命令，只有仍处于初始提示符的连接才会被复用
+    _RESET_COMMANDS: Tuple[bytes, ...] = ()
+
+    __slots__ = (
+        "protocol", "login_timeout", "command_timeout", "socket_read_timeout",
+        "command_max_duration", "prompt_pattern", "_reader", "_lock",
+        "_username_bytes", "_password_bytes", "session_starts", "_iac_pending",
+        "home_prompt",
+    )
+
     def __init__(self, host: str, port: int, username: str, password: str):
         super().__init__(host, port, username, password)
         self.protocol = TelnetProtocol()
         self.login_timeout = 10
-        self.command_timeout = 30
-        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+        self.command_timeout = 30  # 命令开始输出前的最长等待时间
+        self.socket_read_timeout = 2.0  # 单次读取的超时时间
+        self.command_max_duration = 300  # 单条命令的最长执行时间
         self.prompt_pattern = None  # 动态记录提示符
+        # 登录凭据只编码一次，连接复用或重新登录时直接发送
+        self._username_bytes = username.encode('ascii')
+        self._password_bytes = password.encode('ascii')
+        # 基于asyncio流的连接：client保存StreamWriter，_reader保存StreamReader
+        self._reader: Optional[asyncio.StreamReader] = None
+        # 上一次读取末尾不完整的Telnet命令序列，拼接到下一次读取的数据之前
+        self._iac_pending = b""
+        # Telnet会话是串行的，同一连接上的命令逐条执行，避免读写交错
+        self._lock = asyncio.Lock()
+        # 最近几次会话的开始时间，连接池复用连接时追加
+        self.session_starts: Deque[float] = deque(maxlen=_SESSION_HISTORY_SIZE)
+        # 登录完成时的提示符行（如<R1>、[R1]），归还和复用连接时以此确认回到了初始视图
+        self.home_prompt: Optional[bytes] = None
     
     async def connect(self, timeout: int = 30) -> Tuple[bool, str]:
         """建立Telnet连接"""
         try:
-            self.status = ConnectionStatus.CONNECTING
+            self.transition(ConnectionStatus.CONNECTING)
             logger.info(f"正在连接到 {self.host}:{self.port}")
             
-            # 在线程池中执行连接操作
-            loop = asyncio.get_event_loop()
-            success, message = await loop.run_in_executor(
-                self.executor, 
-                self._connect_sync, 
-                timeout
-            )
+            success, message = await self._open_session(timeout)
             
             if success:
-                self.status = ConnectionStatus.CONNECTED
-                self.connection_time = time.time()
-                self.last_activity_time = time.time()
+                self.connection_time = self.transition(ConnectionStatus.CONNECTED)
+                self.session_starts.append(self.connection_time)
+                try:
+                    self.home_prompt = await self._probe_prompt()
+                except Exception as e:
+                    # 未记录初始提示符的连接只是不会进入连接池
+                    logger.debug(f"记录初始提示符失败: {str(e)}")
                 logger.info(f"成功连接到 {self.host}:{self.port}")
             else:
-                self.status = ConnectionStatus.ERROR
+                self.transition(ConnectionStatus.ERROR)
+                await self._close_streams()
                 logger.error(f"连接失败: {message}")
             
             return success, message
             
         except Exception as e:
-            self.status = ConnectionStatus.ERROR
+            self.transition(ConnectionStatus.ERROR)
+            await self._close_streams()
             error_msg = f"连接异常: {str(e)}"
             logger.error(error_msg)
             return False, error_msg
-    
-    def _connect_sync(self, timeout: int) -> Tuple[bool, str]:
-        """同步连接实现"""
-        try:
-            # 检查主机可达性
-            if not self._check_host_reachable(timeout):
-                return False, f"主机 {self.host}:{self.port} 不可达"
 
-            # 创建Telnet客户端
-            self.client = telnetlib.Telnet()
-            self.client.open(self.host, self.port, timeout)
+    async def _open_streams(self, timeout: float):
+        """打开到设备的TCP连接"""
+        self._reader, self.client = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port),
+            timeout
+        )
+        self._iac_pending = b""
+        # 交互式场景（单字节空格翻页等）禁用Nagle算法，缓冲区在连接建立后设置
+        sock = self.client.get_extra_info('socket')
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, _SOCKET_RCVBUF)
+            # 由内核探测对端是否存活，is_alive只需检查流状态
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            for option, value in _KEEPALIVE_OPTIONS:
+                sock.setsockopt(socket.IPPROTO_TCP, option, value)
+
+    async def _close_streams(self):
+        """关闭TCP连接"""
+        writer, self.client, self._reader = self.client, None, None
+        if writer is None:
+            return
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except Exception:
+            pass
+
+    async def _write(self, *parts: bytes):
+        """发送数据并等待写缓冲区排空，多段数据一次写入，无需先拼接"""
+        self.client.writelines(parts)
+        await self.client.drain()
+
+    async def _read_chunk(self, timeout: float) -> bytes:
+        """读取一块数据并处理Telnet选项协商，超时未收到数据时返回空字节串"""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return b""
+            try:
+                data = await asyncio.wait_for(self._reader.read(_READ_CHUNK_SIZE), remaining)
+            except asyncio.TimeoutError:
+                return b""
+            if not data:
+                raise ConnectionResetError("连接已被设备关闭")
+            if self._iac_pending:
+                data = self._iac_pending + data
+            payload, reply, self._iac_pending = TelnetProtocol.process_incoming(data)
+            if reply:
+                self.client.write(reply)
+            # 整块都是协商命令时继续读取，避免被调用方误判为超时
+            if payload:
+                return payload
+
+    async def _read_until(self, marker: bytes, timeout: float) -> bytearray:
+        """读取数据直到出现marker或超时，返回已读取的全部数据"""
+        data = bytearray()
+        deadline = time.monotonic() + timeout
+        while marker not in data:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            data.extend(await self._read_chunk(remaining))
+        return data
+
+    async def _read_until_suffix(self, suffixes: Tuple[bytes, ...], timeout: float) -> bytearray:
+        """读取数据直到输出末尾（忽略空白）以suffixes之一结尾或超时"""
+        data = bytearray()
+        deadline = time.monotonic() + timeout
+        while not data[-_COMPLETION_TAIL_SIZE:].rstrip().endswith(suffixes):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            data.extend(await self._read_chunk(remaining))
+        return data
+
+    async def _read_until_idle(self, idle_timeout: float) -> bytearray:
+        """持续读取，直到idle_timeout内没有新数据"""
+        data = bytearray()
+        while True:
+            chunk = await self._read_chunk(idle_timeout)
+            if not chunk:
+                return data
+            data.extend(chunk)
+
+    async def _open_session(self, timeout: int) -> Tuple[bool, str]:
+        """建立连接并完成登录"""
+        try:
+            # 连接超时或被拒绝即说明主机不可达，无需单独探测
+            await self._open_streams(timeout)
 
             # 等待用户名提示
-            username_prompt = self.client.read_until(b":", self.login_timeout)
+            username_prompt = await self._read_until(b":", self.login_timeout)
             if not username_prompt:
                 return False, "未收到用户名提示"
 
             # 发送用户名
-            self.client.write(self.username.encode('ascii') + b"\n")
+            await self._write(self._username_bytes, b"\n")
 
             # 等待密码提示
-            password_prompt = self.client.read_until(b":", self.login_timeout)
+            password_prompt = await self._read_until(b":", self.login_timeout)
             if not password_prompt:
                 return False, "未收到密码提示"
 
             # 发送密码
-            self.client.write(self.password.encode('ascii') + b"\n")
+            await self._write(self._password_bytes, b"\n")
 
-            # 等待登录成功，动态检测提示符
-            welcome_msg = self.client.read_very_eager()
-            time.sleep(1)  # 等待提示符稳定
+            # 等待欢迎信息输出到提示符为止
+            prompt_response = await self._read_until_suffix(self._LOGIN_WAIT_SUFFIXES, self.login_timeout)
 
-            # 发送空命令来获取当前提示符
-            self.client.write(b"\n")
-            prompt_response = self.client.read_very_eager()
+            if not prompt_response.rstrip().endswith(self._COMMON_PROMPTS):
+                # 未等到提示符，发送空命令来获取当前提示符
+                await self._write(b"\n")
+                prompt_response = await self._read_until_idle(_IDLE_READ_TIMEOUT)
 
             # 检测并保存提示符模式
             self._detect_prompt_pattern(prompt_response)
 
             return True, "连接成功"
 
-        except socket.timeout:
-            return False, "连接超时"
+        except asyncio.TimeoutError:
+            return False, f"主机 {self.host}:{self.port} 不可达"
         except ConnectionRefusedError:
             return False, "连接被拒绝"
         except Exception as e:
             return False, f"连接失败: {str(e)}"
     
-    def _check_host_reachable(self, timeout: float) -> bool:
-        """检查主机是否可达"""
+    async def _probe_prompt(self) -> bytes:
+        """丢弃未读的输出，发送空行并返回设备回显的提示符行"""
+        await self._read_until_idle(0.01)
+        await self._write(b"\n")
+        response = await self._read_until_suffix(self._COMMON_PROMPTS, _REUSE_PROMPT_TIMEOUT)
+        return bytes(response.rstrip().rsplit(b"\n", 1)[-1].strip())
+
+    async def _at_home_prompt(self) -> bool:
+        """确认设备当前提示符与登录完成时一致（未停留在其他视图或配置模式）"""
+        return bool(self.home_prompt) and await self._probe_prompt() == self.home_prompt
+
+    async def reset_for_pool(self) -> bool:
+        """归还连接池前退回初始视图，上一个会话停留在配置模式等视图时不会带给下一个会话
+
+        Returns:
+            已回到登录完成时的提示符、可以放入连接池时返回True
+        """
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(timeout)
-            result = sock.connect_ex((self.host, self.port))
-            sock.close()
-            return result == 0
-        except Exception:
+            async with self._lock:
+                for command in self._RESET_COMMANDS:
+                    await self._write(command, b"\r\n")
+                    await self._read_until_suffix(self._COMMON_PROMPTS, _REUSE_PROMPT_TIMEOUT)
+                return await self._at_home_prompt()
+        except Exception as e:
+            logger.debug(f"连接退回初始视图失败: {str(e)}")
             return False
-    
+
+    async def prepare_for_reuse(self) -> bool:
+        """复用池中连接前的检查：丢弃上一个会话残留及在池中等待期间收到的输出，并确认设备仍处于初始提示符
+
+        Returns:
+            连接可以交给新会话时返回True
+        """
+        try:
+            async with self._lock:
+                return await self._at_home_prompt()
+        except Exception as e:
+            logger.debug(f"池中连接复用检查失败: {str(e)}")
+            return False
+
     def _detect_prompt_pattern(self, response: bytes):
         """检测提示符模式"""
         try:
             if not response:
                 return
 
-            response_str = response.decode('utf-8', errors='ignore').strip()
-            logger.debug(f"检测到的响应: {repr(response_str)}")
-
-            # 常见提示符模式
-            common_prompts = [b'#', b'>', b'$', b']']
+            tail = response.rstrip()
+            logger.debug(f"检测到的响应: {tail[-64:]!r}")
 
             # 检查响应中的最后一个字符
-            if response_str:
-                last_char = response_str[-1].encode('utf-8')
-                if last_char in common_prompts:
-                    self.prompt_pattern = last_char
-                    logger.info(f"检测到提示符: {last_char.decode('utf-8')}")
-                    return
+            last_char = bytes(tail[-1:])
+            if last_char in self._COMMON_PROMPTS:
+                self.prompt_pattern = last_char
+                logger.info(f"检测到提示符: {last_char.decode('ascii')}")
+                return
 
             # 如果没有找到，使用默认提示符
-            for prompt in common_prompts:
+            for prompt in self._COMMON_PROMPTS:
                 if prompt in response:
                     self.prompt_pattern = prompt
-                    logger.info(f"使用提示符: {prompt.decode('utf-8')}")
+                    logger.info(f"使用提示符: {prompt.decode('ascii')}")
                     return
 
             # 如果都没找到，使用默认
@@ -172,33 +355,43 @@ class TelnetConnection(NetworkConnection):
             if self.status != ConnectionStatus.CONNECTED or not self.client:
                 return False, "连接未建立"
             
-            self.last_activity_time = time.time()
+            async with self._lock:
+                self.last_activity_time = time.time()
+                return await self._run_command(command)
             
-            # 在线程池中执行命令
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                self.executor,
-                self._execute_command_sync,
-                command
-            )
+        except Exception as e:
+            error_msg = f"命令执行异常: {str(e)}"
+            logger.error(error_msg)
+            return False, error_msg
+    
+    async def execute_commands(self, commands: List[str]) -> List[Tuple[bool, str]]:
+        """批量执行命令，整批命令连续执行，中间不会插入其他调用方的命令"""
+        results: List[Tuple[bool, str]] = []
+        try:
+            if self.status != ConnectionStatus.CONNECTED or not self.client:
+                return [(False, "连接未建立")] * len(commands)
             
-            return result
+            async with self._lock:
+                self.last_activity_time = time.time()
+                for command in commands:
+                    results.append(await self._run_command(command))
+            return results
             
         except Exception as e:
             error_msg = f"命令执行异常: {str(e)}"
             logger.error(error_msg)
-            return False, error_msg
+            return results + [(False, error_msg)] * (len(commands) - len(results))
     
-    def _execute_command_sync(self, command: str) -> Tuple[bool, str]:
-        """同步执行命令 - 改进版本支持分页"""
+    async def _run_command(self, command: str) -> Tuple[bool, str]:
+        """执行命令 - 支持分页"""
         try:
             logger.debug(f"执行命令: {command}")
 
             # 发送命令
-            self.client.write(command.encode('utf-8') + b"\n")
+            await self._write(command.encode('utf-8'), b"\n")
 
             # 使用支持分页的方式读取响应
-            response = self._read_command_response_with_pagination()
+            response = await self._read_command_response_with_pagination()
 
             if response:
                 response_str = response.decode('utf-8', errors='ignore')
@@ -212,100 +405,79 @@ class TelnetConnection(NetworkConnection):
             logger.error(f"命令执行异常: {str(e)}")
             return False, f"命令执行失败: {str(e)}"
     
-    def _read_command_response_with_pagination(self) -> bytes:
-        """读取命令响应，支持分页处理 - 修复缓冲区同步问题"""
+    async def _read_command_response_with_pagination(self) -> bytearray:
+        """读取命令响应，支持分页处理
+
+        直接返回读取缓冲区本身，调用方从中解码，不再额外复制整个响应
+        """
+        # 以bytearray原地追加，避免长响应逐块拼接时反复复制
+        full_response = bytearray()
         try:
-            import time
-            import re
-
-            full_response = b""
-            start_time = time.time()
-
-            # 先等待一个短暂的时间，让命令开始执行
-            time.sleep(0.5)
-
-            # 常见的分页提示符
-            pagination_patterns = [
-                b"---- More ----",
-                b"--More--",
-                b"-- More --",
-                b"<--- More --->",
-                b"Press any key to continue",
-                b"Press SPACE to continue",
-                b"\x1b[7m--More--\x1b[m",  # 高亮显示的More
-            ]
-
-            # 记录稳定状态
-            stable_cycles = 0
-            last_response_length = 0
-            max_stable_cycles = 5  # 最大稳定周期数
-
-            while time.time() - start_time < self.command_timeout:
-                # 读取当前可用数据
-                chunk = self.client.read_very_eager()
+            start_time = time.monotonic()
 
-                if chunk:
-                    full_response += chunk
-                    stable_cycles = 0  # 重置稳定计数
-                    last_response_length = len(full_response)
+            # 输出暂停后已发送过回车键则不再重复发送
+            enter_sent = False
+            # 连续空闲读取次数，收到数据后清零
+            idle_reads = 0
+            # 分页提示的查找起点，已处理过的分页提示不会重复匹配
+            scan_from = 0
 
-                    logger.debug(f"读取到数据块: {len(chunk)} 字节，总长度: {len(full_response)}")
+            while True:
+                if time.monotonic() - start_time > self.command_max_duration:
+                    raise asyncio.TimeoutError(f"命令执行超过 {self.command_max_duration} 秒")
+
+                # 超时只针对单次读取，持续输出的长响应不会被截断
+                chunk = await self._read_chunk(self.socket_read_timeout)
 
-                    # 检查是否包含分页提示
-                    response_str = chunk.decode('utf-8', errors='ignore')
-                    has_pagination = any(pattern.decode('utf-8', errors='ignore') in response_str
-                                        for pattern in pagination_patterns
-                                        if pattern not in [b"\x1b[7m--More--\x1b[m"])
+                if chunk:
+                    idle_reads = 0
+                    full_response.extend(chunk)
 
-                    # 检查ANSI编码的More提示
-                    if b"\x1b[7m--More--\x1b[m" in chunk or re.search(rb'\x1b\[\d*m--More--\x1b\[\d*m', chunk):
-                        has_pagination = True
+                    logger.debug(f"读取到数据块: {len(chunk)} 字节，总长度: {len(full_response)}")
 
-                    if has_pagination:
+                    # 检查是否包含分页提示（含ANSI高亮的--More--），提示可能跨两个数据块
+                    match = _PAGINATION_BYTES_RE.search(full_response, scan_from)
+                    if match:
+                        scan_from = match.end()
                         logger.debug("检测到分页提示，发送空格键继续")
                         # 发送空格键继续显示
-                        self.client.write(b" ")
-                        time.sleep(0.3)  # 等待响应
+                        await self._write(b" ")
                         continue
+                    scan_from = max(scan_from, len(full_response) - _PAGINATION_MAX_LEN)
 
                     # 检查是否出现提示符（命令结束）
                     if self._check_command_completion(chunk, full_response):
                         logger.debug("检测到命令完成标记")
                         break
+                    continue
 
-                else:
-                    # 没有新数据，检查是否稳定
-                    if len(full_response) == last_response_length and len(full_response) > 0:
-                        stable_cycles += 1
-                        logger.debug(f"稳定周期: {stable_cycles}/{max_stable_cycles}")
-
-                        if stable_cycles >= max_stable_cycles:
-                            logger.debug("数据稳定，命令可能已完成")
-                            # 再次检查是否有提示符
-                            if self._check_command_completion(b"", full_response):
-                                break
-                            # 如果没有提示符但数据稳定，尝试发送回车键触发提示符
-                            if stable_cycles == max_stable_cycles:
-                                logger.debug("尝试发送回车键触发提示符")
-                                self.client.write(b"\n")
-                                time.sleep(0.2)
-                    else:
-                        stable_cycles = 0
-
-                time.sleep(0.1)  # 等待100ms
-
-            # 最后再次尝试读取任何剩余数据
-            final_chunk = self.client.read_very_eager()
-            if final_chunk:
-                full_response += final_chunk
-                logger.debug(f"最终读取到额外数据: {len(final_chunk)} 字节")
+                idle_reads += 1
+
+                if not full_response:
+                    # 设备尚未输出，最多等待command_timeout
+                    if idle_reads * self.socket_read_timeout >= self.command_timeout:
+                        break
+                    continue
+
+                logger.debug("读取空闲，命令可能已完成")
+                # 再次检查是否有提示符
+                if self._check_command_completion(b"", full_response):
+                    break
+                if idle_reads >= _MAX_IDLE_READS:
+                    logger.debug("连续空闲读取，结束读取")
+                    break
+                # 如果没有提示符但数据稳定，尝试发送回车键触发提示符
+                if not enter_sent:
+                    logger.debug("尝试发送回车键触发提示符")
+                    await self._write(b"\n")
+                    enter_sent = True
 
             logger.info(f"命令响应读取完成，总长度: {len(full_response)} 字节")
             return full_response
 
         except Exception as e:
             logger.error(f"读取分页响应失败: {str(e)}")
-            return full_response if 'full_response' in locals() else b""
+            return full_response
 
     def _check_command_completion(self, chunk: bytes, full_response: bytes) -> bool:
         """检查命令是否完成"""
@@ -315,70 +487,28 @@ class TelnetConnection(NetworkConnection):
                 logger.debug(f"检测到动态提示符: {self.prompt_pattern.decode('utf-8')}")
                 return True
 
-            # 检查通用提示符
-            common_prompts = [b'#', b'>', b'$', b']']
-
-            # 在当前数据块中检查
+            # 在当前数据块中检查提示符（在行尾或单独一行）
             if chunk:
-                lines = chunk.split(b'\n')
-                for line in lines:
+                for line in chunk.split(b'\n'):
                     line = line.strip()
-                    if line and any(prompt in line for prompt in common_prompts):
-                        # 检查是否像提示符（在行尾或单独一行）
-                        line_str = line.decode('utf-8', errors='ignore')
-                        if any(line_str.endswith(prompt.decode('utf-8')) for prompt in common_prompts):
-                            logger.debug(f"检测到通用提示符: {line_str}")
-                            return True
-
-            # 在全部响应中检查最后几行
+                    if line.endswith(self._COMMON_PROMPTS):
+                        logger.debug(f"检测到通用提示符: {line.decode('utf-8', errors='ignore')}")
+                        return True
+
+            # 只在响应末尾检查最后3行，避免每次解码整个响应
             if full_response:
-                response_str = full_response.decode('utf-8', errors='ignore')
-                lines = response_str.split('\n')
-                # 检查最后3行
-                for line in lines[-3:]:
+                for line in full_response[-_COMPLETION_TAIL_SIZE:].split(b'\n')[-3:]:
                     line = line.strip()
-                    if line and any(prompt.decode('utf-8') in line for prompt in common_prompts):
-                        # 检查是否像主机名提示符格式
-                        if ('@' in line and any(line.endswith(prompt.decode('utf-8')) for prompt in common_prompts)):
-                            logger.debug(f"检测到主机提示符: {line}")
-                            return True
+                    # 检查是否像主机名提示符格式
+                    if b'@' in line and line.endswith(self._COMMON_PROMPTS):
+                        logger.debug(f"检测到主机提示符: {line.decode('utf-8', errors='ignore')}")
+                        return True
 
             return False
 
         except Exception as e:
             logger.error(f"检查命令完成状态失败: {str(e)}")
             return False
-        """灵活的命令响应读取"""
-        try:
-            import time
-
-            response = b""
-            start_time = time.time()
-            stable_count = 0  # 连续稳定次数
-            last_length = 0
-
-            while time.time() - start_time < self.command_timeout:
-                # 读取当前可用数据
-                chunk = self.client.read_very_eager()
-
-                if chunk:
-                    response += chunk
-                    stable_count = 0  # 重置稳定计数
-                    last_length = len(response)
-                else:
-                    # 没有新数据，检查是否稳定
-                    if len(response) == last_length and len(response) > 0:
-                        stable_count += 1
-                        if stable_count >= 3:  # 连续3次没有新数据，认为命令完成
-                            break
-
-                time.sleep(0.1)  # 等待100ms
-
-            return response
-
-        except Exception as e:
-            logger.error(f"读取命令响应失败: {str(e)}")
-            return b""
 
     def _clean_command_response(self, response: str, command: str) -> str:
         """清理命令响应数据 - 改进版本"""
@@ -387,40 +517,20 @@ class TelnetConnection(NetworkConnection):
             if command in response:
                 response = response.replace(command, "", 1)
 
-            # 移除分页提示符
-            import re
-            pagination_patterns = [
-                r'---- More ----',
-                r'--More--',
-                r'-- More --',
-                r'<--- More --->',
-                r'Press any key to continue.*?\n?',
-                r'Press SPACE to continue.*?\n?',
-                r'\x1b\[\d*m--More--\x1b\[\d*m',  # ANSI编码的More
-            ]
-
-            for pattern in pagination_patterns:
-                response = re.sub(pattern, '', response, flags=re.IGNORECASE)
-
-            # 移除常见的控制字符
-            response = re.sub(r'\x1b\[[0-9;]*[mK]', '', response)  # ANSI转义序列
-            response = re.sub(r'\r\n|\r', '\n', response)  # 统一换行符
-            response = re.sub(r'\x00|\x07|\x08', '', response)  # 移除控制字符
+            # 一次扫描完成：移除分页提示符和ANSI转义序列，统一换行符
+            response = _CLEAN_RE.sub(_clean_replacement, response)
+            response = response.translate(_CTRL_CHARS_TABLE)  # 移除控制字符
 
             # 移除连续空行
-            response = re.sub(r'\n\s*\n\s*\n', '\n\n', response)
+            response = _BLANK_LINES_RE.sub('\n\n', response)
 
             # 移除开头和结尾的空行
             response = response.strip()
 
             # 移除最后一行的提示符
-            lines = response.split('\n')
-            if lines and lines[-1].strip():
-                last_line = lines[-1].strip()
-                # 检查最后一行是否是提示符
-                if any(prompt in last_line.encode('utf-8') for prompt in [b'#', b'>', b'$', b']']):
-                    lines = lines[:-1]
-                    response = '\n'.join(lines)
+            head, _, last_line = response.rpartition('\n')
+            if last_line.strip() and any(prompt in last_line for prompt in self._COMMON_PROMPTS_STR):
+                response = head
 
             return response
 
@@ -431,11 +541,9 @@ class TelnetConnection(NetworkConnection):
     async def disconnect(self) -> Tuple[bool, str]:
         """断开连接"""
         try:
-            if self.client:
-                self.client.close()
-                self.client = None
+            await self._close_streams()
 
-            self.status = ConnectionStatus.DISCONNECTED
+            self.transition(ConnectionStatus.DISCONNECTED)
             logger.info(f"已断开与 {self.host}:{self.port} 的连接")
             return True, "断开成功"
 
@@ -449,20 +557,5 @@ class TelnetConnection(NetworkConnection):
         if not self.client or self.status != ConnectionStatus.CONNECTED:
             return False
         
-        try:
-            # 检查连接是否断开
-            self.client.sock.settimeout(0.1)
-            data = self.client.sock.recv(1, socket.MSG_PEEK)
-            return True
-        except socket.timeout:
-            return True  # 没有数据可读，连接正常
-        except:
-            return False
-    
-    def __del__(self):
-        """析构函数"""
-        try:
-            if self.executor:
-                self.executor.shutdown(wait=False)
-        except:
-            pass
\ No newline at end of file
+        # 写端未关闭且未收到EOF即认为连接正常，对端失联由TCP keepalive发现并关闭连接
+        return not self.client.is_closing() and not self._reader.at_eof()
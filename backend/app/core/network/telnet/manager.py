@@ -5,39 +5,54 @@ Telnet连接管理器
 
 import asyncio
 import time
+from collections import OrderedDict
+from itertools import islice
 from typing import Dict, Any, Optional, Tuple, List
 import uuid
 
 from app.core.network.base import DeviceType, ConnectionStatus
 from app.core.network.telnet.connection import TelnetConnection
 from app.core.network.telnet.devices.huawei import HuaweiTelnetConnection
+from app.core.network.telnet.pool import telnet_pool
 from app.utils.logger import get_logger
 from app.utils.security import encrypt_device_password, decrypt_device_password
+from app.utils.tasks import spawn_background, cancel_and_wait
 
 logger = get_logger(__name__)
 
+# 定期清理空闲会话的间隔（秒）
+_CLEANUP_INTERVAL = 300
+
 
 class TelnetManager:
     """Telnet连接管理器"""
     
     def __init__(self):
         """初始化Telnet管理器"""
-        self.sessions: Dict[str, TelnetConnection] = {}
+        # 按最近活跃时间排序：最久未活跃的会话在最前面
+        self.sessions: "OrderedDict[str, TelnetConnection]" = OrderedDict()
         self.device_factories = {
             DeviceType.HUAWEI: HuaweiTelnetConnection,
             DeviceType.UNKNOWN: TelnetConnection,
         }
-        self._cleanup_task = None
+        self.pool = telnet_pool
+        self._cleanup_handle: Optional[asyncio.TimerHandle] = None
+        self._cleanup_task: Optional[asyncio.Task] = None
     
-    def _create_connection(self, device_type: str, host: str, port: int, username: str, password: str) -> TelnetConnection:
-        """根据设备类型创建相应的连接"""
+    def _resolve_device_type(self, device_type: str) -> DeviceType:
+        """将设备类型字符串解析为已支持的设备类型"""
         try:
             device_enum = DeviceType(device_type.lower())
         except ValueError:
-            device_enum = DeviceType.UNKNOWN
-        
-        factory_class = self.device_factories.get(device_enum, TelnetConnection)
-        return factory_class(host, port, username, password)
+            return DeviceType.UNKNOWN
+        return device_enum if device_enum in self.device_factories else DeviceType.UNKNOWN
+    
+    def _create_connection(self, device_type: DeviceType, host: str, port: int, username: str, password: str) -> TelnetConnection:
+        """根据设备类型创建相应的连接"""
+        factory_class = self.device_factories.get(device_type, TelnetConnection)
+        connection = factory_class(host, port, username, password)
+        connection.device_type = device_type
+        return connection
     
     async def connect(self, host: str, port: int, username: str, password: str,
                      device_type: str = "unknown", timeout: int = 30) -> Tuple[bool, str, Optional[str]]:
@@ -45,20 +60,31 @@ class TelnetManager:
         try:
             logger.info(f"尝试连接到设备 {host}:{port} (类型: {device_type})")
             
-            # 创建连接对象
-            connection = self._create_connection(device_type, host, port, username, password)
+            device_enum = self._resolve_device_type(device_type)
             
-            # 建立连接
-            success, message = await connection.connect(timeout)
+            # 优先复用连接池中已登录的空闲连接
+            connection = self.pool.acquire(host, port, username, password, device_enum.value)
+            if connection is not None and not await connection.prepare_for_reuse():
+                # 池中连接已无法回到提示符，断开后重新建立连接
+                logger.debug(f"池中连接不可复用，重新连接: {host}:{port}")
+                await connection.disconnect()
+                connection = None
+            if connection is not None:
+                success, message = True, "复用已有连接"
+            else:
+                # 创建连接对象
+                connection = self._create_connection(device_enum, host, port, username, password)
+                
+                # 建立连接
+                success, message = await connection.connect(timeout)
             
             if success:
                 # 存储会话
                 self.sessions[connection.session_id] = connection
                 logger.info(f"会话 {connection.session_id} 创建成功")
                 
-                # 启动清理任务（如果未启动）
-                if not self._cleanup_task:
-                    self._start_cleanup_task()
+                # 安排定期清理（未安排时）
+                self._schedule_cleanup()
                 
                 return True, f"连接成功，会话ID: {connection.session_id}", connection.session_id
             else:
@@ -84,6 +110,7 @@ class TelnetManager:
                 return False, "连接已断开"
             
             logger.debug(f"在会话 {session_id} 中执行命令: {command}")
+            self.sessions.move_to_end(session_id)
             return await connection.execute_command(command)
             
         except Exception as e:
@@ -97,11 +124,12 @@ class TelnetManager:
             if session_id not in self.sessions:
                 return False, "会话不存在"
             
-            connection = self.sessions[session_id]
-            success, message = await connection.disconnect()
-            
             # 从会话字典中移除
-            del self.sessions[session_id]
+            connection = self.sessions.pop(session_id)
+            
+            # 仍可用的连接退回初始视图后归还连接池，同一设备的下一个会话可直接复用；
+            # 无法退回初始视图或已断开的连接由连接池直接关闭
+            success, message = await self.pool.release(connection)
             
             logger.info(f"会话 {session_id} 已断开")
             return success, message
@@ -136,22 +164,30 @@ class TelnetManager:
         cleanup_count = 0
         cleaned_sessions = []
         
-        # 找出需要清理的会话
+        # 找出需要清理的会话：会话按活跃时间排序，遇到第一个未闲置的会话即可停止
         sessions_to_cleanup = []
         for session_id, connection in self.sessions.items():
-            if (connection.last_activity_time and 
-                current_time - connection.last_activity_time > idle_timeout) or \
-               not connection.is_alive():
-                sessions_to_cleanup.append(session_id)
+            if current_time - connection.last_activity_time <= idle_timeout:
+                break
+            sessions_to_cleanup.append(session_id)
+        # 其余未闲置的会话中，已断开的同样清理（is_alive只检查流状态，无网络开销）
+        sessions_to_cleanup.extend(
+            session_id
+            for session_id, connection in islice(self.sessions.items(), len(sessions_to_cleanup), None)
+            if not connection.is_alive()
+        )
         
-        # 清理会话
-        for session_id in sessions_to_cleanup:
-            try:
-                await self._cleanup_session(session_id)
+        # 并发清理会话
+        results = await asyncio.gather(
+            *(self._cleanup_session(session_id, reuse=True) for session_id in sessions_to_cleanup),
+            return_exceptions=True
+        )
+        for session_id, result in zip(sessions_to_cleanup, results):
+            if isinstance(result, Exception):
+                logger.error(f"清理会话 {session_id} 失败: {str(result)}")
+            else:
                 cleanup_count += 1
                 cleaned_sessions.append(session_id)
-            except Exception as e:
-                logger.error(f"清理会话 {session_id} 失败: {str(e)}")
         
         if cleanup_count > 0:
             logger.info(f"清理了 {cleanup_count} 个空闲或断开的会话")
@@ -163,56 +199,64 @@ class TelnetManager:
             "remaining_sessions": len(self.sessions)
         }
     
-    async def _cleanup_session(self, session_id: str):
-        """清理单个会话"""
+    async def _cleanup_session(self, session_id: str, reuse: bool = False):
+        """清理单个会话
+
+        Args:
+            reuse: 为True时（闲置清理）仍可用的连接退回初始视图后归还连接池，否则直接断开
+        """
         if session_id in self.sessions:
-            connection = self.sessions[session_id]
+            connection = self.sessions.pop(session_id)
             try:
-                await connection.disconnect()
+                if reuse:
+                    await self.pool.release(connection)
+                else:
+                    await connection.disconnect()
             except:
                 pass
-            del self.sessions[session_id]
     
-    def _start_cleanup_task(self):
-        """启动定期清理任务"""
-        if self._cleanup_task is None or self._cleanup_task.done():
-            self._cleanup_task = asyncio.create_task(self._periodic_cleanup())
-            logger.debug("已启动定期会话清理任务")
+    def _schedule_cleanup(self):
+        """用定时器安排下一次清理，等待期间不占用常驻任务"""
+        if self._cleanup_handle is None:
+            loop = asyncio.get_running_loop()
+            self._cleanup_handle = loop.call_later(_CLEANUP_INTERVAL, self._run_cleanup_tick)
+            logger.debug("已安排定期会话清理")
     
-    async def _periodic_cleanup(self):
-        """定期清理任务"""
-        try:
-            while True:
-                await asyncio.sleep(300)  # 每5分钟检查一次
-                if self.sessions:
-                    await self.cleanup_idle_sessions()
-                else:
-                    # 没有活跃会话时停止清理任务
-                    break
-        except asyncio.CancelledError:
-            logger.debug("定期清理任务已取消")
-        except Exception as e:
-            logger.error(f"定期清理任务异常: {str(e)}")
+    def _run_cleanup_tick(self):
+        """定时器回调：启动一次清理并安排下一次"""
+        self._cleanup_handle = None
+        if not self.sessions:
+            # 没有活跃会话时停止定期清理，下次建立连接时重新安排
+            return
+        if self._cleanup_task is None or self._cleanup_task.done():
+            self._cleanup_task = spawn_background(self.cleanup_idle_sessions())
+        self._schedule_cleanup()
     
     async def shutdown(self):
         """关闭管理器，清理所有资源"""
         logger.info("正在关闭Telnet管理器...")
         
-        # 取消清理任务
-        if self._cleanup_task:
-            self._cleanup_task.cancel()
-            try:
-                await self._cleanup_task
-            except asyncio.CancelledError:
-                pass
+        # 取消定时器和正在进行的清理
+        if self._cleanup_handle:
+            self._cleanup_handle.cancel()
+            self._cleanup_handle = None
+        try:
+            await cancel_and_wait(self._cleanup_task)
+        finally:
+            self._cleanup_task = None
         
-        # 断开所有会话
+        # 并发断开所有会话
         sessions_to_close = list(self.sessions.keys())
-        for session_id in sessions_to_close:
-            try:
-                await self._cleanup_session(session_id)
-            except Exception as e:
-                logger.error(f"关闭会话 {session_id} 失败: {str(e)}")
+        results = await asyncio.gather(
+            *(self._cleanup_session(session_id) for session_id in sessions_to_close),
+            return_exceptions=True
+        )
+        for session_id, result in zip(sessions_to_close, results):
+            if isinstance(result, Exception):
+                logger.error(f"关闭会话 {session_id} 失败: {str(result)}")
+        
+        # 断开连接池中的空闲连接
+        await self.pool.close()
         
         logger.info("Telnet管理器已关闭")
     
@@ -0,0 +1,198 @@
+"""
+Telnet连接池
+缓存已登录的空闲连接，同一设备的后续会话可直接复用，省去TCP握手和登录过程
+"""
+
+import asyncio
+import hmac
+import time
+from typing import Dict, Any, Optional, Tuple, List
+
+from app.config.settings import settings
+from app.core.network.telnet.connection import TelnetConnection
+from app.utils.logger import get_logger
+from app.utils.tasks import spawn_background, cancel_and_wait
+
+logger = get_logger(__name__)
+
+# 连接池键：(主机, 端口, 用户名, 设备类型)
+PoolKey = Tuple[str, int, str, str]
+
+
+class TelnetConnectionPool:
+    """Telnet空闲连接池"""
+
+    def __init__(self, max_size: int = 100, idle_timeout: int = 300, max_age: int = 3600):
+        """初始化连接池
+
+        Args:
+            max_size: 池中最多保留的空闲连接数
+            idle_timeout: 空闲连接的最长保留时间（秒）
+            max_age: 连接自建立起的最长使用时间（秒）
+        """
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_age = max_age
+        self._pool: Dict[PoolKey, List[TelnetConnection]] = {}
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._reaper_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def make_key(host: str, port: int, username: str, device_type: str) -> PoolKey:
+        """生成连接池键"""
+        return host, port, username, device_type.lower()
+
+    def acquire(self, host: str, port: int, username: str, password: str,
+                device_type: str = "unknown") -> Optional[TelnetConnection]:
+        """取出一个可用的空闲连接，没有时返回None（由调用方新建连接）"""
+        idle = self._pool.get(self.make_key(host, port, username, device_type))
+        if idle:
+            now = time.time()
+            secret = password.encode('utf-8')
+            for index in range(len(idle) - 1, -1, -1):
+                connection = idle[index]
+                # 密码必须一致，避免凭错误密码复用他人已登录的连接
+                if not hmac.compare_digest(connection.password.encode('utf-8'), secret):
+                    continue
+                del idle[index]
+                self._size -= 1
+                if not self._is_usable(connection, now):
+                    self._discard(connection)
+                    continue
+                # 复用的连接分配新的会话ID，旧会话ID随之失效
+                connection.renew_session_id()
+                connection.last_activity_time = now
+                connection.session_starts.append(now)
+                self._hits += 1
+                logger.debug(f"连接池命中: {host}:{port} ({username})")
+                return connection
+
+        self._misses += 1
+        return None
+
+    async def release(self, connection: TelnetConnection) -> Tuple[bool, str]:
+        """归还连接，连接不可用、无法退回初始视图或池已满且无可淘汰连接时直接断开"""
+        if not self._is_usable(connection, time.time()) or not await connection.reset_for_pool():
+            return await connection.disconnect()
+        now = time.time()
+        if self._size >= self.max_size and not self._evict_for(connection):
+            return await connection.disconnect()
+
+        key = self.make_key(connection.host, connection.port, connection.username,
+                            connection.device_type.value)
+        connection.last_activity_time = now
+        self._pool.setdefault(key, []).append(connection)
+        self._size += 1
+        self._start_reaper()
+        return True, "断开成功"
+
+    @staticmethod
+    def _eviction_rank(connection: TelnetConnection) -> Tuple[float, float]:
+        """LRU-K淘汰排序键，越小越先淘汰
+
+        按倒数第K次会话的开始时间排序；会话次数不足K次的一次性连接排在最前，
+        避免突发的一次性诊断会话挤掉被反复复用的连接
+        """
+        starts = connection.session_starts
+        if not starts:
+            return float('-inf'), float('-inf')
+        kth = starts[0] if len(starts) == starts.maxlen else float('-inf')
+        return kth, starts[-1]
+
+    def _evict_for(self, connection: TelnetConnection) -> bool:
+        """池满时为connection腾出位置，淘汰排序更靠前的空闲连接
+
+        Returns:
+            是否已腾出位置；connection本身最应淘汰时返回False
+        """
+        victim_key, victim_index, victim = None, -1, None
+        for key, idle in self._pool.items():
+            for index, candidate in enumerate(idle):
+                if victim is None or self._eviction_rank(candidate) < self._eviction_rank(victim):
+                    victim_key, victim_index, victim = key, index, candidate
+        if victim is None or self._eviction_rank(connection) <= self._eviction_rank(victim):
+            return False
+
+        idle = self._pool[victim_key]
+        del idle[victim_index]
+        if not idle:
+            del self._pool[victim_key]
+        self._size -= 1
+        self._discard(victim)
+        return True
+
+    def _is_usable(self, connection: TelnetConnection, now: float) -> bool:
+        """检查连接是否存活且未超过最长使用时间"""
+        if not connection.is_alive():
+            return False
+        return not (connection.connection_time and now - connection.connection_time > self.max_age)
+
+    def _discard(self, connection: TelnetConnection):
+        """在后台断开被淘汰的连接"""
+        self._evictions += 1
+        spawn_background(connection.disconnect())
+
+    def _start_reaper(self):
+        """启动空闲连接回收任务"""
+        if self._reaper_task is None or self._reaper_task.done():
+            self._reaper_task = spawn_background(self._reap_idle())
+
+    async def _reap_idle(self):
+        """定期淘汰空闲超时、超龄或已断开的连接"""
+        try:
+            while self._size:
+                await asyncio.sleep(self.idle_timeout / 2)
+                now = time.time()
+                for key, idle in list(self._pool.items()):
+                    keep = []
+                    for connection in idle:
+                        if (now - connection.last_activity_time <= self.idle_timeout
+                                and self._is_usable(connection, now)):
+                            keep.append(connection)
+                        else:
+                            self._discard(connection)
+                    self._size -= len(idle) - len(keep)
+                    if keep:
+                        self._pool[key] = keep
+                    else:
+                        del self._pool[key]
+        except asyncio.CancelledError:
+            logger.debug("连接池回收任务已取消")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取连接池统计信息"""
+        return {
+            "idle_connections": self._size,
+            "max_size": self.max_size,
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+        }
+
+    async def close(self):
+        """断开池中所有连接"""
+        try:
+            await cancel_and_wait(self._reaper_task)
+        finally:
+            self._reaper_task = None
+
+        idle_connections = [connection for idle in self._pool.values() for connection in idle]
+        self._pool.clear()
+        self._size = 0
+        results = await asyncio.gather(
+            *(connection.disconnect() for connection in idle_connections),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"关闭池中连接失败: {str(result)}")
+
+
+# 全局Telnet连接池实例
+telnet_pool = TelnetConnectionPool(
+    max_size=settings.TELNET_POOL_MAX_SIZE,
+    idle_timeout=settings.TELNET_POOL_IDLE_TIMEOUT,
+)
@@ -3,7 +3,7 @@ Telnet协议常量和工具函数
 """
 
 import re
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 # Telnet控制字符常量
 IAC = bytes([255])  # Interpret As Command
@@ -24,6 +24,52 @@ OPT_LFLOW = bytes([33])  # Remote Flow Control
 OPT_LINEMODE = bytes([34])  # Linemode
 OPT_NEW_ENVIRON = bytes([39])  # New Environment Option
 
+# 协商处理按整数比较字节，避免逐字节切片
+_IAC_B, _DONT_B, _DO_B, _WONT_B, _WILL_B, _SB_B = IAC[0], DONT[0], DO[0], WONT[0], WILL[0], SB[0]
+_OPTION_COMMANDS = (_DO_B, _DONT_B, _WILL_B, _WONT_B)
+_ACCEPTED_OPTIONS = (OPT_ECHO[0], OPT_SGA[0])
+_IAC_WILL = IAC + WILL
+_IAC_WONT = IAC + WONT
+_IAC_DONT = IAC + DONT
+
+# 响应清理与识别使用的正则，导入时编译一次
+_ANSI_ESCAPE_RE = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
+# 需删除的字符：回车符及除换行、制表符外的控制字符（\r\n删去\r后即为\n）
+_DELETE_CHARS_TABLE = dict.fromkeys((*range(0x00, 0x09), 0x0B, 0x0C, *range(0x0D, 0x20), 0x7F))
+_HOSTNAME_RES = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'hostname\s+(\S+)',
+    r'sysname\s+(\S+)',
+    r'([a-zA-Z0-9-_]+)>',
+    r'([a-zA-Z0-9-_]+)#'
+))
+# 设备厂商关键字 -> 设备类型，按识别优先级排列
+_VENDOR_KEYWORDS = {
+    'huawei': 'huawei', 'vrp': 'huawei',
+    'cisco': 'cisco', 'ios': 'cisco',
+    'juniper': 'juniper', 'junos': 'juniper',
+    'h3c': 'h3c', 'comware': 'h3c',
+}
+_VENDOR_PRIORITY = tuple(dict.fromkeys(_VENDOR_KEYWORDS.values()))
+_VENDOR_RE = re.compile('|'.join(_VENDOR_KEYWORDS), re.IGNORECASE)
+# 常见提示符模式
+_PROMPT_PATTERNS = (
+    r'[a-zA-Z0-9\-_\.]+[>#\$]',  # 设备名 + > 或 # 或 $
+    r'\[[a-zA-Z0-9\-_\.@]+\][>#\$]',  # [用户@设备名] + > 或 # 或 $
+    r'[a-zA-Z0-9\-_\.]+\([a-zA-Z0-9\-_\.]+\)[>#]',  # 设备名(模式) + > 或 #
+)
+# 合并为一个正则，每个模式对应一个命名分组；各分支为前瞻，按顺序尝试，保持"先列出的模式优先"
+_PROMPT_RE = re.compile('|'.join(
+    f'(?=.*?(?P<p{index}>{pattern}))' for index, pattern in enumerate(_PROMPT_PATTERNS)
+))
+# 分页提示符均为固定文本，合并为一个忽略大小写的正则，一次扫描完成匹配
+_MORE_RE = re.compile('|'.join(re.escape(prompt) for prompt in (
+    '--more--',
+    '-- more --',
+    '(more)',
+    'press any key to continue',
+    'press space to continue',
+)), re.IGNORECASE)
+
 
 class TelnetProtocol:
     """Telnet协议处理工具类"""
@@ -31,29 +77,84 @@ class TelnetProtocol:
     @staticmethod
     def negotiate_options(data: bytes) -> bytes:
         """处理Telnet选项协商"""
-        # 简单的选项协商处理
-        response = b''
+        # 简单的选项协商处理：按整数下标逐字节扫描，不为每个字节创建切片
+        response = bytearray()
+        n = len(data)
         i = 0
-        while i < len(data):
-            if data[i:i+1] == IAC and i + 2 < len(data):
-                command = data[i+1:i+2]
-                option = data[i+2:i+3]
+        while i < n:
+            if data[i] == _IAC_B and i + 2 < n:
+                command = data[i + 1]
+                option = data[i + 2]
                 
-                if command == DO:
+                if command == _DO_B:
                     # 对大多数选项回应 WONT
-                    if option in [OPT_ECHO, OPT_SGA]:
-                        response += IAC + WILL + option
-                    else:
-                        response += IAC + WONT + option
-                elif command == WILL:
+                    response += _IAC_WILL if option in _ACCEPTED_OPTIONS else _IAC_WONT
+                    response.append(option)
+                elif command == _WILL_B:
                     # 对大多数选项回应 DONT
-                    response += IAC + DONT + option
+                    response += _IAC_DONT
+                    response.append(option)
                 
                 i += 3
             else:
                 i += 1
         
-        return response
+        return bytes(response)
+    
+    @staticmethod
+    def process_incoming(data: bytes) -> Tuple[bytes, bytes, bytes]:
+        """分离接收数据中的Telnet命令
+
+        Returns:
+            (去除命令后的数据, 需要回复的协商响应, 末尾不完整的命令序列)；
+            不完整的IAC命令或子协商被拆分在两次读取之间，调用方需将其拼接到下一次读取的数据之前
+        """
+        if _IAC_B not in data:
+            return data, b'', b''
+        
+        # 与telnetlib默认行为一致：拒绝所有选项协商
+        reply = bytearray()
+        payload = bytearray()
+        n = len(data)
+        i = 0
+        while i < n:
+            # 普通数据整段复制到下一个IAC为止
+            iac = data.find(IAC, i)
+            if iac < 0:
+                payload += data[i:]
+                break
+            payload += data[i:iac]
+            i = iac
+            
+            if i + 1 >= n:
+                # IAC位于末尾，命令字节在下一次读取中
+                return bytes(payload), bytes(reply), data[i:]
+            command = data[i + 1]
+            if command == _IAC_B:
+                # 转义的0xFF数据字节
+                payload.append(_IAC_B)
+                i += 2
+            elif command in _OPTION_COMMANDS:
+                if i + 2 >= n:
+                    # 选项字节在下一次读取中
+                    return bytes(payload), bytes(reply), data[i:]
+                if command == _DO_B:
+                    reply += _IAC_WONT
+                    reply.append(data[i + 2])
+                elif command == _WILL_B:
+                    reply += _IAC_DONT
+                    reply.append(data[i + 2])
+                i += 3
+            elif command == _SB_B:
+                # 跳过子协商直到 IAC SE，结束标记未到达时留待下一次读取
+                end = data.find(IAC + SE, i + 2)
+                if end < 0:
+                    return bytes(payload), bytes(reply), data[i:]
+                i = end + 2
+            else:
+                i += 2
+        
+        return bytes(payload), bytes(reply), b''
     
     @staticmethod
     def clean_response(text: str) -> str:
@@ -61,17 +162,8 @@ class TelnetProtocol:
         if not text:
             return ""
         
-        # 移除ANSI转义序列
-        ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
-        text = ansi_escape.sub('', text)
-        
-        # 移除回车符但保留换行符
-        text = text.replace('\r\n', '\n').replace('\r', '')
-        
-        # 移除控制字符（除了换行和制表符）
-        text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', text)
-        
-        return text
+        # 先移除ANSI转义序列，再一次性删除回车符和控制字符（保留换行和制表符）
+        return _ANSI_ESCAPE_RE.sub('', text).translate(_DELETE_CHARS_TABLE)
     
     @staticmethod
     def extract_device_info(response: str) -> dict:
@@ -83,29 +175,17 @@ class TelnetProtocol:
             'model': ''
         }
         
-        response_lower = response.lower()
-        
-        # 检测设备类型
-        if any(keyword in response_lower for keyword in ['huawei', 'vrp']):
-            info['device_type'] = 'huawei'
-        elif any(keyword in response_lower for keyword in ['cisco', 'ios']):
-            info['device_type'] = 'cisco'
-        elif any(keyword in response_lower for keyword in ['juniper', 'junos']):
-            info['device_type'] = 'juniper'
-        elif any(keyword in response_lower for keyword in ['h3c', 'comware']):
-            info['device_type'] = 'h3c'
+        # 检测设备类型：一次扫描找出所有厂商关键字，多个厂商同时出现时按优先级取
+        vendors = {_VENDOR_KEYWORDS[keyword.lower()] for keyword in _VENDOR_RE.findall(response)}
+        for vendor in _VENDOR_PRIORITY:
+            if vendor in vendors:
+                info['device_type'] = vendor
+                break
         
         # 提取主机名
-        hostname_patterns = [
-            r'hostname\s+(\S+)',
-            r'sysname\s+(\S+)',
-            r'([a-zA-Z0-9-_]+)>',
-            r'([a-zA-Z0-9-_]+)#'
-        ]
-        
-        for pattern in hostname_patterns:
-            match = re.search(pattern, response, re.IGNORECASE)
-            if match and not info['hostname']:
+        for pattern in _HOSTNAME_RES:
+            match = pattern.search(response)
+            if match:
                 info['hostname'] = match.group(1)
                 break
         
@@ -114,36 +194,14 @@ class TelnetProtocol:
     @staticmethod
     def detect_prompt_pattern(text: str) -> Optional[str]:
         """检测命令提示符模式"""
-        lines = text.strip().split('\n')
-        if not lines:
-            return None
-            
-        last_line = lines[-1].strip()
-        
-        # 常见提示符模式
-        patterns = [
-            r'[a-zA-Z0-9\-_\.]+[>#\$]',  # 设备名 + > 或 # 或 $
-            r'\[[a-zA-Z0-9\-_\.@]+\][>#\$]',  # [用户@设备名] + > 或 # 或 $
-            r'[a-zA-Z0-9\-_\.]+\([a-zA-Z0-9\-_\.]+\)[>#]',  # 设备名(模式) + > 或 #
-        ]
+        last_line = text.strip().rpartition('\n')[2].strip()
         
-        for pattern in patterns:
-            if re.search(pattern, last_line):
-                return pattern
-        
-        return None
+        match = _PROMPT_RE.match(last_line)
+        if match is None:
+            return None
+        return _PROMPT_PATTERNS[int(match.lastgroup[1:])]
     
     @staticmethod
     def is_more_prompt(text: str) -> bool:
         """检测是否是分页提示符"""
-        more_patterns = [
-            r'--More--',
-            r'-- More --', 
-            r'\(more\)',
-            r'Press any key to continue',
-            r'Press SPACE to continue',
-            r'\[Press space to continue or Ctrl-C to abort\]'
-        ]
-        
-        text_lower = text.lower()
-        return any(re.search(pattern.lower(), text_lower) for pattern in more_patterns)
\ No newline at end of file
+        return _MORE_RE.search(text) is not None
@@ -1,6 +1,12 @@
 import asyncio
+import hashlib
+import hmac
 import logging
+import socket
+import threading
 import time
+import weakref
+from collections import OrderedDict
 from typing import Dict, Any, Optional, Tuple
 import uuid
 import re
@@ -13,12 +19,129 @@ from app.utils.security import encrypt_device_password, decrypt_device_password
 
 logger = get_logger(__name__)
 
+# 共享SSH客户端的键：(主机, 端口, 用户名)
+SSHTarget = Tuple[str, int, str]
+
+# 等待命令首个输出的最长时间（秒）
+_FIRST_OUTPUT_TIMEOUT = 10
+# 输出停止超过该时间（秒）即认为命令输出结束
+_OUTPUT_IDLE_TIMEOUT = 0.5
+# 单条命令读取输出的最长时间（秒），持续输出的命令（如长时间ping、debug）到时返回已读取的部分
+_COMMAND_MAX_DURATION = 300
+# 单次从通道读取的最大字节数
+_RECV_SIZE = 65535
+# 分页提示（---- More ---- / --More--，大小写均可），合并为一个正则一次扫描
+_MORE_RE_BYTES = re.compile(rb'---- [Mm]ore ----|--[Mm]ore--')
+# 分页提示的最大长度，提示可能跨两次读取，匹配时回看已累积输出的末尾
+_MORE_MAX_LEN = 16
+# 单独成行的终端提示符（设备名 + > 或 # 或 $）
+_PROMPT_LINE_RE = re.compile(r'^[\w\-\.]+[>#\$]\s*$')
+# 输出末尾出现设备提示符（含华为系统视图的]）即认为命令执行完毕；
+# 提示符后只可能跟空格，以换行结尾的是普通输出行（如以]结尾的日志）
+_PROMPT_TAIL_RE = re.compile(rb'[\w\-.]+[>#$\]][ \t]*\Z')
+# 判断提示符时只检查输出末尾的字节数
+_PROMPT_TAIL_SIZE = 256
+# 会话建立时等待初始提示符、版本探测输出的最长时间（秒）
+_LOGIN_PROMPT_TIMEOUT = 1
+_VERSION_PROBE_TIMEOUT = 2
+# 传输层保活报文间隔（秒），保持NAT/防火墙上的空闲连接映射不失效
+_KEEPALIVE_INTERVAL = 30
+# HTTP服务横幅：含"HTTP"或任意大小写的"html"，一次扫描且无需整体转小写
+_HTTP_BANNER_RE = re.compile(rb'HTTP|(?i:html)')
+# display version输出中的版本信息
+_VERSION_RE = re.compile(r'(Software|Version|System).*?(\d+\.\d+\.\d+)')
+
+class SSHSession:
+    """单个SSH会话的记录，命令路径上频繁读写，使用__slots__按属性存取"""
+
+    __slots__ = (
+        "client", "shell", "host", "port", "username", "password", "device_info",
+        "last_command", "created_at", "last_active",
+    )
+
+    # get_session_info对外公开的字段（不含客户端、通道和密码）
+    _PUBLIC_FIELDS = (
+        "host", "port", "username", "device_info", "last_command",
+        "created_at", "last_active",
+    )
+
+    def __init__(self, client: paramiko.SSHClient, shell: paramiko.Channel, host: str, port: int,
+                 username: str, password: str, device_info: str, created_at: float):
+        self.client = client
+        self.shell = shell
+        self.host = host
+        self.port = port
+        self.username = username
+        # 加密后的密码
+        self.password = password
+        self.device_info = device_info
+        self.last_command = ""
+        self.created_at = created_at
+        self.last_active = time.time()
+
+    def get_info(self) -> Dict[str, Any]:
+        """获取会话信息（敏感信息已移除）"""
+        return {field: getattr(self, field) for field in self._PUBLIC_FIELDS}
+
+
 class SSHManager:
     """SSH连接管理器"""
     
     def __init__(self):
         """初始化SSH管理器"""
-        self.clients: Dict[str, Dict[str, Any]] = {}
+        # 按最近活跃时间排序：最久未活跃的会话在最前面
+        self.clients: "OrderedDict[str, SSHSession]" = OrderedDict()
+        self.command_max_duration = _COMMAND_MAX_DURATION
+        # 以下均为辅助索引，只弱引用客户端和通道，由self.clients中的会话持有所有权；
+        # 即使某条路径移除会话时漏掉同步，条目也会随客户端/通道被回收而自动消失
+        # 同一目标的会话共用一个已认证的SSH客户端，每个会话只占用其中一个shell通道
+        self._clients_by_target: "weakref.WeakValueDictionary[SSHTarget, paramiko.SSHClient]" = \
+            weakref.WeakValueDictionary()
+        # 共享客户端的认证信息：密码摘要和设备信息
+        self._client_info: "weakref.WeakKeyDictionary[paramiko.SSHClient, Dict[str, Any]]" = \
+            weakref.WeakKeyDictionary()
+        # 每个SSH客户端上仍打开的会话数，降为0时关闭客户端
+        self._client_refs: "weakref.WeakKeyDictionary[paramiko.SSHClient, int]" = weakref.WeakKeyDictionary()
+        # 每个shell通道的输出队列，由常驻读取器填充，通道关闭时收到b""
+        self._output_queues: "weakref.WeakKeyDictionary[paramiko.Channel, asyncio.Queue]" = \
+            weakref.WeakKeyDictionary()
+        # 每个目标的建连锁，只在有协程等待握手时存在
+        self._connect_locks: "weakref.WeakValueDictionary[SSHTarget, asyncio.Lock]" = \
+            weakref.WeakValueDictionary()
+    
+    @staticmethod
+    def _password_digest(password: str) -> bytes:
+        """计算密码摘要，用于判断能否复用已认证的客户端"""
+        return hashlib.sha256(password.encode('utf-8')).digest()
+    
+    def _get_shared_client(self, target: SSHTarget, password: str) -> Optional[paramiko.SSHClient]:
+        """查找目标上传输层仍可用且密码一致的共享客户端"""
+        client = self._clients_by_target.get(target)
+        if client is None:
+            return None
+        transport = client.get_transport()
+        info = self._client_info.get(client)
+        if transport is None or not transport.is_active() or info is None:
+            self._clients_by_target.pop(target, None)
+            return None
+        if not hmac.compare_digest(info["password_digest"], self._password_digest(password)):
+            return None
+        return client
+    
+    def _release_client(self, session_data: SSHSession) -> Optional[paramiko.SSHClient]:
+        """释放会话对客户端的引用，返回需要关闭的客户端（仍有其他会话使用时返回None）"""
+        client = session_data.client
+        if client is None or client not in self._client_refs:
+            return client
+        self._client_refs[client] -= 1
+        if self._client_refs[client] > 0:
+            return None
+        del self._client_refs[client]
+        self._client_info.pop(client, None)
+        target = (session_data.host, session_data.port, session_data.username)
+        if self._clients_by_target.get(target) is client:
+            del self._clients_by_target[target]
+        return client
         
     async def connect(
         self, host: str, port: int, username: str, password: str, timeout: int = 10
@@ -30,17 +153,44 @@ class SSHManager:
             Tuple[bool, str, Optional[str]]: (成功标志, 消息, 会话ID或None)
         """
         session_id = f"ssh-{uuid.uuid4().hex[:8]}"
+        target = (host, port, username)
         
+        shared = self._get_shared_client(target, password)
+        if shared is None:
+            # 同一目标的并发建连排队进行：后到的会话等首个握手完成后复用其传输层，
+            # 避免同时发起多次TCP+认证握手而触发服务端MaxStartups限制
+            lock = self._connect_locks.get(target)
+            if lock is None:
+                lock = self._connect_locks[target] = asyncio.Lock()
+            async with lock:
+                shared = self._get_shared_client(target, password)
+                if shared is None:
+                    return await self._connect_new(session_id, target, host, port, username,
+                                                   password, timeout)
+        
+        # 目标上已有认证通过的客户端时，直接在其传输层上开启新的shell通道
+        try:
+            return await self._open_session(session_id, shared, host, port, username,
+                                            password, self._client_info[shared]["device_info"])
+        except Exception as e:
+            logger.warning(f"复用SSH连接失败，重新建立连接: {str(e)}")
+            self._clients_by_target.pop(target, None)
+        return await self._connect_new(session_id, target, host, port, username, password, timeout)
+    
+    async def _connect_new(
+        self, session_id: str, target: SSHTarget, host: str, port: int, username: str,
+        password: str, timeout: int
+    ) -> Tuple[bool, str, Optional[str]]:
+        """建立新的SSH连接（TCP握手和认证），成功后登记为目标的共享客户端"""
         try:
             # 首先检查目标端口并尝试识别服务类型
-            import socket
             protocol_info = None
             try:
-                sock = socket.create_connection((host, port), timeout=5)
+                # 使用异步连接探测，等待期间不阻塞事件循环
+                reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout=5)
                 # 尝试读取服务横幅来识别协议
-                sock.settimeout(3)
                 try:
-                    banner_data = sock.recv(1024)
+                    banner_data = await asyncio.wait_for(reader.read(1024), timeout=3)
                     if banner_data:
                         # 检查是否是Telnet协议（通常以0xff开头）
                         if banner_data[0] == 0xff:
@@ -49,12 +199,16 @@ class SSHManager:
                         elif banner_data.startswith(b'SSH-'):
                             protocol_info = "ssh"
                         # 检查是否是HTTP协议
-                        elif b'HTTP' in banner_data or b'html' in banner_data.lower():
+                        elif _HTTP_BANNER_RE.search(banner_data):
                             protocol_info = "http"
-                except (socket.timeout, socket.error):
+                except (asyncio.TimeoutError, OSError):
                     # 如果无法读取横幅，尝试发送SSH客户端标识
                     pass
-                sock.close()
+                writer.close()
+                try:
+                    await writer.wait_closed()
+                except OSError:
+                    pass
 
                 # 如果检测到是Telnet服务，给出明确提示
                 if protocol_info == "telnet":
@@ -66,8 +220,8 @@ class SSHManager:
                     logger.error(error_msg)
                     return False, error_msg, None
 
-            except (socket.timeout, socket.error) as e:
-                error_msg = f"无法连接到主机 {host}:{port} - {str(e)}"
+            except (asyncio.TimeoutError, OSError) as e:
+                error_msg = f"无法连接到主机 {host}:{port} - {str(e) or '连接超时'}"
                 logger.error(error_msg)
                 return False, error_msg, None
 
@@ -86,54 +240,19 @@ class SSHManager:
                 look_for_keys=False,
                 allow_agent=False
             )
+            self._tune_transport(client)
             
-            # 获取设备信息
-            transport = client.get_transport()
-            if transport:
-                device_info = f"{transport.remote_version}"
-            else:
-                device_info = "Unknown device"
-                
-            # 创建交互式会话通道（而不是每次命令都创建新通道）
-            shell_channel = await asyncio.to_thread(client.invoke_shell)
-            
-            # 等待初始提示
-            await asyncio.sleep(1)
-            initial_output = await asyncio.to_thread(shell_channel.recv, 4096)
-            logger.debug(f"SSH初始输出: {initial_output.decode('utf-8', 'replace')}")
-            
-            # 获取更详细的设备信息
             try:
-                # 尝试发送简单命令来获取更多设备信息
-                await asyncio.to_thread(shell_channel.send, "display version\n")
-                await asyncio.sleep(2)
-                version_output = await asyncio.to_thread(shell_channel.recv, 4096)
-                device_info_match = re.search(r'(Software|Version|System).*?(\d+\.\d+\.\d+)', 
-                                              version_output.decode('utf-8', 'replace'))
-                if device_info_match:
-                    device_info = device_info_match.group(0)
-            except Exception as e:
-                logger.debug(f"获取详细设备信息失败: {str(e)}")
-            
-            # 加密存储密码
-            encrypted_password = encrypt_device_password(password)
-            
-            # 记录连接
-            self.clients[session_id] = {
-                "client": client,
-                "shell": shell_channel,
-                "host": host,
-                "port": port,
-                "username": username,
-                "password": encrypted_password,
-                "device_info": device_info,
-                "last_command": "",
-                "created_at": asyncio.get_event_loop().time(),
-                "last_active": time.time()
+                result = await self._open_session(session_id, client, host, port, username, password)
+            except Exception:
+                await asyncio.to_thread(client.close)
+                raise
+            self._clients_by_target[target] = client
+            self._client_info[client] = {
+                "password_digest": self._password_digest(password),
+                "device_info": self.clients[session_id].device_info,
             }
-            
-            logger.info(f"SSH连接成功: {host}:{port} 用户: {username}")
-            return True, f"SSH连接成功: {host}", session_id
+            return result
             
         except AuthenticationException:
             error_msg = f"SSH认证失败: {host} 用户: {username}"
@@ -175,6 +294,74 @@ class SSHManager:
             logger.error(error_msg)
             return False, error_msg, None
     
+    @staticmethod
+    def _tune_transport(client: paramiko.SSHClient):
+        """调整传输层套接字：关闭Nagle算法降低交互命令往返延迟，并开启保活"""
+        transport = client.get_transport()
+        if transport is None:
+            return
+        sock = transport.sock
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        except (OSError, AttributeError) as e:
+            # 经代理等非TCP套接字建立的连接不支持这些选项
+            logger.debug(f"设置SSH套接字选项失败: {str(e)}")
+        transport.set_keepalive(_KEEPALIVE_INTERVAL)
+    
+    async def _open_session(
+        self, session_id: str, client: paramiko.SSHClient, host: str, port: int,
+        username: str, password: str, device_info: Optional[str] = None
+    ) -> Tuple[bool, str, Optional[str]]:
+        """在已认证的客户端上开启交互式shell通道并记录会话
+
+        Args:
+            device_info: 已知的设备信息，复用客户端时传入以跳过版本探测
+        """
+        # 创建交互式会话通道（而不是每次命令都创建新通道）
+        shell_channel = await asyncio.to_thread(client.invoke_shell)
+        output_queue = self._start_reader(shell_channel)
+        
+        # 等待初始提示，出现提示符即返回
+        initial_output = await self._receive_full_output_with_pagination(
+            shell_channel, output_queue, _LOGIN_PROMPT_TIMEOUT
+        )
+        logger.debug(f"SSH初始输出: {initial_output}")
+        
+        if device_info is None:
+            # 获取设备信息
+            transport = client.get_transport()
+            if transport:
+                device_info = f"{transport.remote_version}"
+            else:
+                device_info = "Unknown device"
+            
+            # 获取更详细的设备信息
+            try:
+                # 尝试发送简单命令来获取更多设备信息
+                await self._send(shell_channel, "display version\n")
+                version_output = await self._receive_full_output_with_pagination(
+                    shell_channel, output_queue, _VERSION_PROBE_TIMEOUT
+                )
+                device_info_match = _VERSION_RE.search(version_output)
+                if device_info_match:
+                    device_info = device_info_match.group(0)
+            except Exception as e:
+                logger.debug(f"获取详细设备信息失败: {str(e)}")
+        
+        # 加密存储密码
+        encrypted_password = encrypt_device_password(password)
+        
+        # 记录连接
+        self.clients[session_id] = SSHSession(
+            client, shell_channel, host, port, username, encrypted_password,
+            device_info, asyncio.get_event_loop().time()
+        )
+        self._client_refs[client] = self._client_refs.get(client, 0) + 1
+        
+        logger.info(f"SSH连接成功: {host}:{port} 用户: {username}")
+        return True, f"SSH连接成功: {host}", session_id
+    
     async def execute_command(self, session_id: str, command: str) -> Tuple[bool, str]:
         """
         在SSH连接上执行命令
@@ -186,25 +373,25 @@ class SSHManager:
             return False, "错误: SSH会话不存在或已过期"
         
         session_data = self.clients[session_id]
-        shell = session_data.get("shell")
+        shell = session_data.shell
         
         if not shell or not shell.active:
             # 如果会话已经失效，尝试重新连接
             try:
-                logger.warning(f"SSH会话已失效，尝试重新连接: {session_data['host']}:{session_data['port']}")
-                password = decrypt_device_password(session_data["password"])
+                logger.warning(f"SSH会话已失效，尝试重新连接: {session_data.host}:{session_data.port}")
+                password = decrypt_device_password(session_data.password)
                 success, msg, new_session_id = await self.connect(
-                    session_data["host"], 
-                    session_data["port"], 
-                    session_data["username"], 
+                    session_data.host, 
+                    session_data.port, 
+                    session_data.username, 
                     password,
                     timeout=10
                 )
                 
                 if success and new_session_id:
-                    # 更新会话信息
+                    # 更新会话信息，释放旧会话对客户端的引用
                     if session_id in self.clients:
-                        del self.clients[session_id]
+                        await self.disconnect(session_id)
                     return await self.execute_command(new_session_id, command)
                 else:
                     return False, f"会话已失效且无法重新连接: {msg}"
@@ -214,25 +401,22 @@ class SSHManager:
         
         try:
             # 记录最后一条命令和活动时间
-            session_data["last_command"] = command
-            session_data["last_active"] = time.time()
+            session_data.last_command = command
+            session_data.last_active = time.time()
+            self.clients.move_to_end(session_id)
             
-            # 发送命令
-            await asyncio.to_thread(shell.send, command + "\n")
+            # 丢弃上一条命令之后残留的输出（如保活换行迟到的提示符），避免被误判为本命令已结束
+            output_queue = self._output_queues[shell]
+            self._drain_output(output_queue)
             
-            # 给设备一些时间开始执行命令
-            await asyncio.sleep(0.5)
+            # 发送命令
+            await self._send(shell, command + "\n")
             
             # 接收完整输出，处理分页提示
-            full_output = await self._receive_full_output_with_pagination(shell)
-            
-            # 处理输出 - 移除命令回显和终端提示符
-            processed_output = self._process_command_output(command, full_output)
+            full_output = await self._receive_full_output_with_pagination(shell, output_queue)
             
-            # 规范化输出格式
-            normalized_output = self._normalize_output(processed_output)
-            
-            return True, normalized_output
+            # 处理输出 - 移除命令回显和终端提示符，规范化输出格式
+            return True, self._postprocess_output(command, full_output)
             
         except Exception as e:
             error_msg = f"执行SSH命令时出错: {str(e)}"
@@ -243,123 +427,181 @@ class SSHManager:
                     shell.active = False
             return False, error_msg
     
-    async def _receive_full_output_with_pagination(self, shell) -> str:
-        """接收完整的命令输出，自动处理分页提示"""
-        full_output = ""
-        more_prompt_patterns = [
-            b"---- More ----", 
-            b"--More--",
-            b"---- more ----",
-            b"--more--"
-        ]
+    def _start_reader(self, shell: paramiko.Channel) -> asyncio.Queue:
+        """为shell通道启动常驻读取器，收到的数据依次放入输出队列
+
+        paramiko通道的fileno()在有数据到达或通道关闭时变为可读，注册到事件循环后由内核唤醒，
+        命令只需从队列取数据，无需每次读取都转到线程池执行
+        """
+        loop = asyncio.get_running_loop()
+        output_queue: asyncio.Queue = asyncio.Queue()
+        self._output_queues[shell] = output_queue
+        fd = shell.fileno()
+        
+        def on_readable():
+            if shell.recv_ready():
+                output_queue.put_nowait(shell.recv(_RECV_SIZE))
+            elif shell.closed or shell.eof_received:
+                loop.remove_reader(fd)
+                output_queue.put_nowait(b"")
         
-        # 初始等待时间（秒）
-        initial_wait = 1
-        # 最大尝试次数
-        max_attempts = 50
-        # 当前尝试次数
-        attempt = 0
+        try:
+            loop.add_reader(fd, on_readable)
+        except NotImplementedError:
+            # Windows的Proactor事件循环不支持add_reader，改用专门的读取线程
+            threading.Thread(
+                target=self._reader_loop, args=(shell, output_queue, loop), daemon=True
+            ).start()
+        return output_queue
+    
+    @staticmethod
+    def _reader_loop(shell: paramiko.Channel, output_queue: asyncio.Queue,
+                     loop: asyncio.AbstractEventLoop):
+        """读取线程：阻塞读取通道，把数据交给事件循环，通道关闭后退出"""
+        while True:
+            try:
+                data = shell.recv(_RECV_SIZE)
+            except Exception:
+                data = b""
+            try:
+                loop.call_soon_threadsafe(output_queue.put_nowait, data)
+            except RuntimeError:
+                # 事件循环已关闭
+                return
+            if not data:
+                return
+    
+    def _stop_reader(self, shell: paramiko.Channel):
+        """停止shell通道的读取器"""
+        if self._output_queues.pop(shell, None) is None:
+            return
+        try:
+            asyncio.get_running_loop().remove_reader(shell.fileno())
+        except (NotImplementedError, ValueError, OSError):
+            # 读取线程在通道关闭后自行退出
+            pass
+    
+    @staticmethod
+    async def _send(shell: paramiko.Channel, data: str):
+        """向通道发送数据
+
+        paramiko的send在发送窗口已满或密钥重协商期间会阻塞等待，只有窗口有空间且传输层未在重协商时
+        才直接在事件循环中发送（此时send只做加密和非阻塞写入，立即返回），否则转到线程中发送。
+        检查与发送之间仍可能开始重协商，此时事件循环最多阻塞到重协商完成；交互命令很短、重协商很少，
+        以这一小概率的短暂阻塞换取常规发送不占用线程池
+        """
+        payload = data.encode("utf-8")
+        direct = shell.send_ready() and shell.get_transport().clear_to_send.is_set()
+        sent = shell.send(payload) if direct else 0
+        if sent < len(payload):
+            await asyncio.to_thread(shell.sendall, payload[sent:])
+    
+    @staticmethod
+    def _drain_output(output_queue: asyncio.Queue) -> bytes:
+        """取出队列中已收到的全部输出"""
+        chunks = []
+        while not output_queue.empty():
+            chunks.append(output_queue.get_nowait())
+        return b"".join(chunks)
+    
+    async def _receive_full_output_with_pagination(self, shell, output_queue: asyncio.Queue,
+                                                   first_timeout: float = _FIRST_OUTPUT_TIMEOUT) -> str:
+        """接收完整的命令输出，自动处理分页提示
+
+        输出末尾出现设备提示符时立即返回；否则在输出停顿_OUTPUT_IDLE_TIMEOUT秒后返回；
+        设备持续输出时最多读取command_max_duration秒
+
+        Args:
+            first_timeout: 等待首个输出的最长时间（秒）
+        """
+        # 按字节累积，分页提示在字节上检测和移除，返回前统一解码一次
+        full_output = bytearray()
         
-        # 第一次读取输出
-        await asyncio.sleep(initial_wait)
-        output = await asyncio.to_thread(shell.recv, 65535)
-        full_output += output.decode("utf-8", errors="replace")
+        # 最大分页次数
+        max_pages = 50
+        # 已翻页次数
+        pages = 0
+        # 分页提示的查找起点
+        scan_from = 0
         
-        # 检查并处理分页
-        while attempt < max_attempts:
-            # 检查是否有分页提示
-            has_more_prompt = False
-            for prompt in more_prompt_patterns:
-                if prompt in output:
-                    has_more_prompt = True
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.command_max_duration
+        # 首次等待设备开始输出，之后遇到提示符或输出停顿即认为结束
+        wait_timeout = first_timeout
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                logger.warning(f"命令输出超过 {self.command_max_duration} 秒仍未结束，返回已读取的输出")
+                break
+            try:
+                output = await asyncio.wait_for(output_queue.get(), min(wait_timeout, remaining))
+            except asyncio.TimeoutError:
+                if wait_timeout < remaining:
                     break
-            
-            if not has_more_prompt:
-                # 检查是否还有更多数据可读
-                if await asyncio.to_thread(lambda: shell.recv_ready()):
-                    # 还有数据，但没有分页提示，继续读取
-                    await asyncio.sleep(0.5)
-                    output = await asyncio.to_thread(shell.recv, 65535)
-                    if not output:  # 如果没有更多数据，退出循环
-                        break
-                    full_output += output.decode("utf-8", errors="replace")
-                else:
-                    # 没有更多数据可读，退出循环
+                # 等待被总时限截断，回到循环开头记录超时
+                continue
+            if not output:  # 通道已关闭
+                break
+            wait_timeout = _OUTPUT_IDLE_TIMEOUT
+            full_output += output
+            
+            # 从回看位置开始检查分页提示，拆在两次读取中的提示同样能匹配到
+            has_more_prompt = _MORE_RE_BYTES.search(full_output, scan_from) is not None
+            if has_more_prompt:
+                # 从输出中移除分页提示，只改写回看位置之后的部分
+                full_output[scan_from:] = _MORE_RE_BYTES.sub(b"", full_output[scan_from:])
+            scan_from = max(len(full_output) - _MORE_MAX_LEN, 0)
+            
+            if has_more_prompt:
+                if pages >= max_pages:
+                    logger.warning(f"命令输出过长，已达到最大翻页次数({max_pages})，可能未获取完整输出")
                     break
-            else:
                 # 遇到分页提示，发送空格继续
                 logger.debug("检测到分页提示，发送空格继续...")
-                await asyncio.to_thread(shell.send, " ")
-                # 等待一小段时间接收新数据
-                await asyncio.sleep(0.5)
-                output = await asyncio.to_thread(shell.recv, 65535)
-                # 从输出中移除分页提示
-                output_text = output.decode("utf-8", errors="replace")
-                for prompt_text in ["---- More ----", "--More--", "---- more ----", "--more--"]:
-                    output_text = output_text.replace(prompt_text, "")
-                full_output += output_text
-            
-            attempt += 1
-            
-        # 如果达到最大尝试次数，记录警告
-        if attempt >= max_attempts:
-            logger.warning(f"命令输出过长，已达到最大尝试次数({max_attempts})，可能未获取完整输出")
+                await self._send(shell, " ")
+                pages += 1
+            elif _PROMPT_TAIL_RE.search(full_output, max(len(full_output) - _PROMPT_TAIL_SIZE, 0)):
+                break
         
-        return full_output
+        return full_output.decode("utf-8", errors="replace")
     
-    def _process_command_output(self, command: str, output: str) -> str:
-        """处理命令输出，移除回显和提示符"""
+    def _postprocess_output(self, command: str, output: str) -> str:
+        """处理命令输出：移除回显和提示符，并规范化缩进，单次遍历完成"""
         if not output:
             return ""
-            
-        # 按行分割输出
-        lines = output.split("\n")
+        
+        command = command.strip()
+        # 循环内用到的方法绑定为局部变量，大输出（如完整配置）逐行处理时省去属性查找
+        match_prompt = _PROMPT_LINE_RE.match
         processed_lines = []
+        append = processed_lines.append
         
         # 移除第一行（通常是命令回显）
         command_found = False
-        for i, line in enumerate(lines):
+        for line in output.split("\n"):
+            lstripped = line.lstrip()
+            stripped = lstripped.rstrip()
             # 跳过空行
-            if not line.strip():
+            if not stripped:
                 continue
                 
             # 如果找到命令回显行，跳过它
-            if not command_found and command.strip() in line:
+            if not command_found and command in line:
                 command_found = True
                 continue
                 
             # 跳过可能的提示符行
-            if re.match(r'^[\w\-\.]+[>#\$]\s*$', line.strip()):
+            if match_prompt(stripped):
                 continue
-                
-            processed_lines.append(line)
-        
-        return "\n".join(processed_lines)
-    
-    def _normalize_output(self, text: str) -> str:
-        """规范化命令输出，处理格式问题"""
-        if not text:
-            return ""
             
-        lines = text.split("\n")
-        processed_lines = []
-        
-        for line in lines:
             # 处理过多的前导空格（通常表示右对齐）
-            if line.strip():
-                # 统计前导空格数量
-                leading_spaces = len(line) - len(line.lstrip())
-                # 如果有过多前导空格（可能是右对齐文本）
-                if leading_spaces > 8:
-                    # 保留最多4个空格作为缩进
-                    indent = " " * min(4, leading_spaces // 2) 
-                    line = indent + line.strip()
-                
-                processed_lines.append(line)
-            else:
-                # 保留空行以维持段落分隔
-                processed_lines.append("")
+            leading_spaces = len(line) - len(lstripped)
+            if leading_spaces > 8:
+                # 保留最多4个空格作为缩进
+                line = " " * min(4, leading_spaces // 2) + stripped
                 
+            append(line)
+        
         return "\n".join(processed_lines)
     
     async def disconnect(self, session_id: str) -> Tuple[bool, str]:
@@ -374,31 +616,33 @@ class SSHManager:
         
         try:
             session_data = self.clients[session_id]
-            client = session_data.get("client")
-            shell = session_data.get("shell")
-            host = session_data.get("host", "unknown")
+            shell = session_data.shell
+            host = session_data.host
             
             # 尝试优雅退出
             if shell and shell.active:
                 try:
-                    await asyncio.to_thread(shell.send, "exit\n")
+                    await self._send(shell, "exit\n")
                     await asyncio.sleep(0.5)
                 except:
                     pass
             
+            # 移除会话，没有其他会话共用客户端时才关闭连接
+            del self.clients[session_id]
+            client = self._release_client(session_data)
+            
             # 关闭会话和连接
             if shell:
+                self._stop_reader(shell)
                 try:
-                    await asyncio.to_thread(shell.close)
+                    # 关闭通道只发送一条关闭消息，不会阻塞
+                    shell.close()
                 except:
                     pass
                     
             if client:
                 await asyncio.to_thread(client.close)
             
-            # 移除会话
-            del self.clients[session_id]
-            
             logger.info(f"已关闭SSH连接: {host}")
             return True, f"已成功断开SSH连接: {host}"
             
@@ -408,7 +652,15 @@ class SSHManager:
             
             # 尝试强制移除会话
             if session_id in self.clients:
-                del self.clients[session_id]
+                session_data = self.clients.pop(session_id)
+                if session_data.shell:
+                    self._stop_reader(session_data.shell)
+                client = self._release_client(session_data)
+                if client:
+                    try:
+                        client.close()
+                    except Exception:
+                        pass
                 
             return False, error_msg
     
@@ -417,8 +669,7 @@ class SSHManager:
         if session_id not in self.clients:
             return False
             
-        session_data = self.clients[session_id]
-        shell = session_data.get("shell")
+        shell = self.clients[session_id].shell
         
         if not shell:
             return False
@@ -430,12 +681,13 @@ class SSHManager:
                 return False
                 
             # 可选：发送保活信息
-            await asyncio.to_thread(shell.send, "\n")
+            await self._send(shell, "\n")
             await asyncio.sleep(0.1)
             
             # 清除任何响应
-            if await asyncio.to_thread(lambda: shell.recv_ready()):
-                await asyncio.to_thread(shell.recv, 1024)
+            output_queue = self._output_queues.get(shell)
+            if output_queue is not None:
+                self._drain_output(output_queue)
                 
             return True
         except Exception as e:
@@ -447,45 +699,25 @@ class SSHManager:
         if session_id not in self.clients:
             return None
             
-        info = self.clients[session_id].copy()
-        
-        # 移除敏感信息
-        for key in ["client", "shell", "password"]:
-            if key in info:
-                del info[key]
-            
-        return info
+        return self.clients[session_id].get_info()
         
     def get_all_sessions(self) -> Dict[str, Dict[str, Any]]:
         """获取所有会话信息（敏感信息已移除）"""
-        sessions = {}
-        
-        for session_id, info in self.clients.items():
-            session_info = info.copy()
-            
-            # 移除敏感信息
-            for key in ["client", "shell", "password"]:
-                if key in session_info:
-                    del session_info[key]
-                
-            sessions[session_id] = session_info
-            
-        return sessions
+        return {session_id: session.get_info() for session_id, session in self.clients.items()}
         
     async def cleanup_idle_sessions(self, idle_timeout: int = 600) -> int:
         """清理闲置的会话，返回清理的会话数"""
         current_time = time.time()
         sessions_to_cleanup = []
         
+        # 会话按活跃时间排序，遇到第一个未闲置的会话即可停止
         for session_id, session_data in self.clients.items():
-            last_active = session_data.get("last_active", 0)
-            if (current_time - last_active) > idle_timeout:
-                sessions_to_cleanup.append(session_id)
-                
-        cleanup_count = 0
-        for session_id in sessions_to_cleanup:
-            success, _ = await self.disconnect(session_id)
-            if success:
-                cleanup_count += 1
+            if (current_time - session_data.last_active) <= idle_timeout:
+                break
+            sessions_to_cleanup.append(session_id)
                 
-        return cleanup_count 
\ No newline at end of file
+        # 并发断开，每个会话的优雅退出等待互不阻塞
+        results = await asyncio.gather(
+            *(self.disconnect(session_id) for session_id in sessions_to_cleanup)
+        )
+        return sum(1 for success, _ in results if success) 
\ No newline at end of file
@@ -1,9 +1,14 @@
 import asyncio
 import logging
-from typing import Dict, Any, Optional, Tuple, List
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Optional, Tuple, List
 import time
 
+from app.config.settings import settings
+from app.utils.eviction import pick_coldest
 from app.utils.logger import get_logger
+from app.utils.tasks import spawn_background
 from app.core.ssh import SSHManager
 from app.core.telnet import TelnetManager
 from app.models.terminal import (
@@ -13,6 +18,13 @@ from app.models.terminal import (
 
 logger = get_logger(__name__)
 
+
+def _last_activity_ts(session: SessionInfo) -> float:
+    """会话最后活动时间戳：新建会话的last_activity经模型转换为datetime，执行命令后为time.time()"""
+    last_activity = session.last_activity
+    return last_activity.timestamp() if isinstance(last_activity, datetime) else last_activity
+
+
 class TerminalManager:
     """终端管理器，整合SSH和Telnet功能"""
     
@@ -20,14 +32,16 @@ class TerminalManager:
         """初始化终端管理器"""
         self.ssh_manager = SSHManager()
         self.telnet_manager = TelnetManager()
-        self.sessions: Dict[str, SessionInfo] = {}
+        # 按最近活动时间排序：最久未活动的会话在最前面
+        self.sessions: "OrderedDict[str, SessionInfo]" = OrderedDict()
+        self.max_sessions = settings.SESSION_STORE_MAX_SIZE
         self.lock = asyncio.Lock()
         
         # 启动会话检查任务（如果是在异步环境中初始化的）
         try:
             loop = asyncio.get_event_loop()
             if not loop.is_closed():
-                self.session_check_task = loop.create_task(self._session_check_routine())
+                self.session_check_task = spawn_background(self._session_check_routine(), loop)
         except Exception as e:
             logger.warning(f"无法启动会话检查任务: {str(e)}")
     
@@ -54,7 +68,7 @@ class TerminalManager:
         for session_id, session in self.sessions.items():
             if session.connection_type == "ssh":
                 # 如果会话在过去2分钟内有活动，我们不需要检查它
-                if (current_time - session.last_activity) < 120:
+                if (current_time - _last_activity_ts(session)) < 120:
                     continue
                 ssh_session_ids.append(session_id)
         
@@ -121,6 +135,12 @@ class TerminalManager:
                     is_active=True,
                     last_activity=time.time()  # 确保设置初始活动时间
                 )
+                victim = self._pick_eviction_victim(exclude=session_id)
+            
+            # 超出会话上限时断开最冷的会话，同时从SSH/Telnet管理器和本会话表中移除
+            if victim is not None:
+                logger.warning(f"终端会话数超过上限 {self.max_sessions}，淘汰会话 {victim}")
+                await self.disconnect(victim)
             
             return ConnectionResponse(
                 success=True,
@@ -151,6 +171,8 @@ class TerminalManager:
         try:
             # 更新会话最后活动时间
             session.last_activity = time.time()
+            session.command_count += 1
+            self.sessions.move_to_end(session_id)
             
             if session.connection_type == "ssh":
                 success, output = await self.ssh_manager.execute_command(session_id, command)
@@ -225,6 +247,16 @@ class TerminalManager:
                     
             return False, f"断开连接时出错: {str(e)}"
     
+    def _pick_eviction_victim(self, exclude: str) -> Optional[str]:
+        """会话数超出上限时选出最久未用且命令最少的会话，未超限时返回None"""
+        if len(self.sessions) <= self.max_sessions:
+            return None
+        return pick_coldest(
+            ((session_id, _last_activity_ts(session), session.command_count)
+             for session_id, session in self.sessions.items() if session_id != exclude),
+            time.time()
+        )
+    
     async def get_all_sessions(self) -> List[SessionInfo]:
         """获取所有活跃会话"""
         return list(self.sessions.values())
@@ -238,17 +270,17 @@ class TerminalManager:
         current_time = time.time()
         sessions_to_cleanup = []
         
-        # 找出闲置的会话
+        # 找出闲置的会话：会话按活动时间排序，遇到第一个未闲置的会话即可停止
         for session_id, session in self.sessions.items():
-            if (current_time - session.last_activity) > idle_timeout:
-                sessions_to_cleanup.append(session_id)
+            if (current_time - _last_activity_ts(session)) <= idle_timeout:
+                break
+            sessions_to_cleanup.append(session_id)
         
-        # 断开这些会话
-        cleaned_count = 0
-        for session_id in sessions_to_cleanup:
-            success, _ = await self.disconnect(session_id)
-            if success:
-                cleaned_count += 1
+        # 并发断开这些会话，每个会话的优雅退出等待互不阻塞
+        results = await asyncio.gather(
+            *(self.disconnect(session_id) for session_id in sessions_to_cleanup)
+        )
+        cleaned_count = sum(1 for success, _ in results if success)
         
         # 同时让SSH和Telnet管理器进行它们自己的清理
         try:
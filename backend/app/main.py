@@ -1,31 +1,77 @@
 import asyncio
+from contextlib import asynccontextmanager
+import httpx
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 import time
 
 from app.api.api_v1.api import api_router
+from app.api.deps import get_terminal_service
 from app.config.settings import settings
-from app.services.terminal_service import TerminalService
+from app.core.network.telnet import telnet_manager
+from app.services.ai.manager import ai_service_manager
+from app.services.ai.providers.deepseek_provider import DEEPSEEK_POOL_LIMITS
 from app.utils.logger import get_logger
+from app.utils.tasks import cancel_and_wait
 
 # 使用统一的日志管理器获取logger
 logger = get_logger(__name__)
 
+# 创建后台任务
+async def cleanup_idle_sessions():
+    """定期清理闲置的终端会话"""
+    # 使用与API相同的终端服务实例，才能清理到实际的会话
+    terminal_service = await get_terminal_service()
+    while True:
+        try:
+            result = await terminal_service.cleanup_idle_sessions()
+            if result["cleaned_count"] > 0:
+                logger.info(f"定期清理: {result['message']}")
+        except Exception as e:
+            logger.error(f"定期清理任务出错: {str(e)}")
+        # 每5分钟运行一次
+        await asyncio.sleep(300)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期：启动时挂载共享服务并启动后台任务，关闭时释放资源"""
+    # 应用级共享的HTTP客户端，所有基于httpx的AI服务复用同一个连接池
+    app.state.http_client = httpx.AsyncClient(
+        limits=DEEPSEEK_POOL_LIMITS,
+        timeout=httpx.Timeout(30.0)
+    )
+    app.state.ai_manager = ai_service_manager
+    app.state.ai_manager.attach_http_client(app.state.http_client)
+    app.state.cleanup_task = asyncio.create_task(cleanup_idle_sessions())
+    logger.info("已启动定期会话清理任务")
+
+    yield
+
+    await cancel_and_wait(app.state.cleanup_task)
+    logger.info("已取消定期会话清理任务")
+    # 断开Telnet会话和连接池中的空闲连接，并停止连接池回收任务
+    await telnet_manager.shutdown()
+    await app.state.ai_manager.cleanup()
+    await app.state.http_client.aclose()
+
 # 创建FastAPI应用
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     docs_url=f"{settings.API_V1_STR}/docs",
     redoc_url=f"{settings.API_V1_STR}/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 # 添加CORS中间件
 if settings.BACKEND_CORS_ORIGINS:
     app.add_middleware(
         CORSMiddleware,
-        allow_origins=[str(origin) for origin in settings.BACKEND_CORS_ORIGINS],
+        allow_origins=list(settings.BACKEND_CORS_ORIGINS),
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
@@ -52,36 +98,6 @@ async def root():
     """根路径重定向到API文档"""
     return {"message": f"请访问 {settings.API_V1_STR}/docs 查看API文档"}
 
-# 创建后台任务
-async def cleanup_idle_sessions():
-    """定期清理闲置的终端会话"""
-    terminal_service = TerminalService()
-    while True:
-        try:
-            result = await terminal_service.cleanup_idle_sessions()
-            if result["cleaned_count"] > 0:
-                logger.info(f"定期清理: {result['message']}")
-        except Exception as e:
-            logger.error(f"定期清理任务出错: {str(e)}")
-        # 每5分钟运行一次
-        await asyncio.sleep(300)
-
-@app.on_event("startup")
-async def start_background_tasks():
-    """启动后台任务"""
-    app.state.cleanup_task = asyncio.create_task(cleanup_idle_sessions())
-    logger.info("已启动定期会话清理任务")
-
-@app.on_event("shutdown")
-async def shutdown_background_tasks():
-    """关闭后台任务"""
-    if hasattr(app.state, "cleanup_task"):
-        app.state.cleanup_task.cancel()
-        try:
-            await app.state.cleanup_task
-        except asyncio.CancelledError:
-            logger.info("已取消定期会话清理任务")
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
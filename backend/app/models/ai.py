@@ -1,5 +1,5 @@
 from typing import Dict, List, Optional, Literal, Any, Union
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, validator, model_validator
 from datetime import datetime
 import logging
 from app.utils.logger import get_logger
@@ -132,6 +132,13 @@ class ChatResponse(BaseModel):
     usage: Dict[str, Any] = Field(default_factory=dict, description="使用情况统计")
     content: Optional[str] = Field(None, description="响应内容，方便前端直接获取")
     
+    @model_validator(mode="after")
+    def default_content_from_message(self):
+        """未提供content时使用message.content填充"""
+        if not self.content:
+            self.content = self.message.content
+        return self
+    
     class Config:
         # 允许额外字段
         extra = "ignore"
@@ -46,6 +46,7 @@ class SessionInfo(BaseModel):
     connected_at: datetime = Field(default_factory=datetime.now)
     last_activity: datetime = Field(default_factory=datetime.now)
     is_active: bool = Field(True, description="会话是否活跃")
+    command_count: int = Field(0, description="已执行的命令数")
     
     class Config:
         json_schema_extra = {
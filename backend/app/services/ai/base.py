@@ -3,6 +3,7 @@ AI服务基类
 定义统一的AI模型接口规范
 """
 
+import json
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any, AsyncGenerator, Optional, Tuple
 from enum import Enum
@@ -102,7 +103,6 @@ class AIProviderBase(ABC):
         
         try:
             # 尝试解析错误详情
-            import json
             error_data = json.loads(response_text)
             if "error" in error_data:
                 error_detail = error_data["error"]
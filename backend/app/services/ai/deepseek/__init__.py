@@ -6,8 +6,13 @@ Deepseek专用模块
 from .client import DeepseekClient, get_deepseek_client
 from .analyzer import NetworkLogAnalyzer
 
-# 使用懒加载函数代替直接实例化
-deepseek_client = get_deepseek_client()
+
+def __getattr__(name: str):
+    """deepseek_client在首次访问时才创建，保证应用启动后能注入共享的HTTP客户端"""
+    if name == 'deepseek_client':
+        return get_deepseek_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     'DeepseekClient',
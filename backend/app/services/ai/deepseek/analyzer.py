@@ -10,19 +10,33 @@ import httpx
 from datetime import datetime
 
 from app.config.settings import settings
+from app.services.ai.providers.deepseek_provider import DEEPSEEK_POOL_LIMITS
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# 日志关键模式，模块加载时编译一次
+_IP_ADDRESS_RE = re.compile(r'\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b')
+_TIMESTAMP_RE = re.compile(r'\d{4}-\d{2}-\d{2}[T\s]\d{2}:\d{2}:\d{2}')
+_ERROR_CODE_RE = re.compile(r'[Ee]rror[:\s]*(\d+)')
+_INTERFACE_RE = re.compile(r'[Ii]nterface[:\s]*([A-Za-z0-9/-]+)')
+_PROTOCOL_RE = re.compile(r'\b(TCP|UDP|HTTP|HTTPS|SSH|TELNET|SNMP)\b', re.IGNORECASE)
+
 
 class NetworkLogAnalyzer:
     """Deepseek网络日志分析器"""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, provider=None):
         self.api_key = api_key
+        # 注入provider时复用其HTTP连接池，不再单独创建客户端
+        self.provider = provider
         self.base_url = getattr(settings, 'DEEPSEEK_API_URL', 'https://api.deepseek.com/v1')
         self.timeout = getattr(settings, 'DEEPSEEK_TIMEOUT', 30)
         self.max_tokens = getattr(settings, 'DEEPSEEK_MAX_TOKENS', 4096)
+        self.headers = provider.headers if provider is not None else {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
         self.client = None
         
         # 网络日志分析专用提示模板
@@ -68,20 +82,21 @@ class NetworkLogAnalyzer:
     
     async def initialize(self):
         """初始化HTTP客户端"""
-        if not self.client:
+        if self.provider is not None:
+            await self.provider.initialize()
+            self.client = self.provider.client
+        elif not self.client:
             self.client = httpx.AsyncClient(
                 timeout=self.timeout,
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                }
+                limits=DEEPSEEK_POOL_LIMITS
             )
     
     async def cleanup(self):
         """清理资源"""
-        if self.client:
+        # 共享的连接池由provider负责关闭
+        if self.client and self.provider is None:
             await self.client.aclose()
-            self.client = None
+        self.client = None
     
     async def analyze_network_log(self, log_content: str, analysis_type: str = "error_analysis") -> Dict[str, Any]:
         """分析网络日志"""
@@ -111,7 +126,9 @@ class NetworkLogAnalyzer:
             
             response = await self.client.post(
                 f"{self.base_url}/chat/completions",
-                json=payload
+                json=payload,
+                headers=self.headers,
+                timeout=self.timeout
             )
             
             if response.status_code == 200:
@@ -173,7 +190,9 @@ class NetworkLogAnalyzer:
             async with self.client.stream(
                 "POST",
                 f"{self.base_url}/chat/completions", 
-                json=payload
+                json=payload,
+                headers=self.headers,
+                timeout=self.timeout
             ) as response:
                 
                 if response.status_code != 200:
@@ -243,11 +262,11 @@ class NetworkLogAnalyzer:
     def extract_log_patterns(self, log_content: str) -> Dict[str, List[str]]:
         """提取日志中的关键模式"""
         patterns = {
-            "ip_addresses": re.findall(r'\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b', log_content),
-            "timestamps": re.findall(r'\d{4}-\d{2}-\d{2}[T\s]\d{2}:\d{2}:\d{2}', log_content),
-            "error_codes": re.findall(r'[Ee]rror[:\s]*(\d+)', log_content),
-            "interfaces": re.findall(r'[Ii]nterface[:\s]*([A-Za-z0-9/-]+)', log_content),
-            "protocols": re.findall(r'\b(TCP|UDP|HTTP|HTTPS|SSH|TELNET|SNMP)\b', log_content, re.IGNORECASE)
+            "ip_addresses": _IP_ADDRESS_RE.findall(log_content),
+            "timestamps": _TIMESTAMP_RE.findall(log_content),
+            "error_codes": _ERROR_CODE_RE.findall(log_content),
+            "interfaces": _INTERFACE_RE.findall(log_content),
+            "protocols": _PROTOCOL_RE.findall(log_content)
         }
         
         return patterns
\ No newline at end of file
@@ -3,6 +3,7 @@ Deepseek客户端包装器
 统一管理Deepseek API访问和专有功能
 """
 
+import asyncio
 import httpx
 from typing import Dict, List, Any, Optional, AsyncGenerator, Union
 from datetime import datetime
@@ -19,7 +20,7 @@ logger = get_logger(__name__)
 class DeepseekClient:
     """Deepseek客户端包装器"""
 
-    def __init__(self, provider=None):
+    def __init__(self, provider=None, http_client: Optional[httpx.AsyncClient] = None):
         self.api_key = settings.DEEPSEEK_API_KEY
         self.enabled = getattr(settings, 'DEEPSEEK_API_ENABLED', True)
 
@@ -30,12 +31,12 @@ class DeepseekClient:
         if self.api_key and self.enabled:
             # 只有在没有注入provider时才创建新的
             if not self.provider:
-                self.provider = DeepseekProvider(self.api_key)
+                self.provider = DeepseekProvider(self.api_key, http_client=http_client)
                 logger.info("Deepseek客户端创建新的Provider实例")
             else:
                 logger.info("Deepseek客户端复用已有Provider实例")
 
-            self.analyzer = NetworkLogAnalyzer(self.api_key)
+            self.analyzer = NetworkLogAnalyzer(self.api_key, provider=self.provider)
             logger.info("Deepseek客户端初始化完成")
         else:
             logger.warning("Deepseek客户端未启用或缺少API密钥")
@@ -194,7 +195,6 @@ class DeepseekClient:
             cleanup_tasks.append(self.analyzer.cleanup())
         
         if cleanup_tasks:
-            import asyncio
             await asyncio.gather(*cleanup_tasks, return_exceptions=True)
         
         logger.info("Deepseek客户端资源清理完成")
@@ -203,7 +203,7 @@ class DeepseekClient:
 # 延迟初始化的全局Deepseek客户端实例
 deepseek_client = None
 
-def get_deepseek_client():
+def get_deepseek_client(http_client: Optional[httpx.AsyncClient] = None):
     """获取全局Deepseek客户端实例，支持依赖注入"""
     global deepseek_client
 
@@ -219,10 +219,16 @@ def get_deepseek_client():
                 deepseek_client = DeepseekClient(provider=existing_provider)
             else:
                 logger.info("AI服务管理器中无Deepseek Provider，创建独立客户端")
-                deepseek_client = DeepseekClient()
+                deepseek_client = DeepseekClient(http_client=http_client)
 
         except ImportError:
             logger.info("AI服务管理器不可用，创建独立Deepseek客户端")
-            deepseek_client = DeepseekClient()
+            deepseek_client = DeepseekClient(http_client=http_client)
+
+    elif http_client is not None:
+        # 实例先于共享HTTP客户端创建时，在其尚未建立自己的客户端前改用共享客户端
+        provider = deepseek_client.provider
+        if provider is not None and provider.client is None:
+            provider.attach_http_client(http_client)
 
     return deepseek_client
\ No newline at end of file
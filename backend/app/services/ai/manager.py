@@ -4,9 +4,12 @@ AI服务管理器
 """
 
 import asyncio
+from functools import cached_property
 from typing import List, Dict, Any, AsyncGenerator, Optional, Tuple
 from datetime import datetime
 
+from pydantic import ValidationError
+
 from app.services.ai.base import AIProviderBase, ProviderType
 from app.services.ai.providers.openai_provider import OpenAIProvider
 from app.services.ai.providers.claude_provider import ClaudeProvider
@@ -67,6 +70,27 @@ class AIServiceManager:
         logger.info(f"总共获取到 {len(models)} 个可用模型")
         return models
     
+    @cached_property
+    def _deepseek_models(self) -> Tuple[AIModel, ...]:
+        """Deepseek模型列表缓存"""
+        return tuple(
+            model for model in self.get_available_models()
+            if model.value.startswith('deepseek-')
+        )
+
+    @cached_property
+    def _model_provider_index(self) -> Dict[str, AIProviderBase]:
+        """模型ID到服务提供商的索引缓存"""
+        index = {}
+        for provider in self.providers.values():
+            for model in provider.get_available_models():
+                index.setdefault(model.value, provider)
+        return index
+
+    def get_deepseek_models(self) -> Tuple[AIModel, ...]:
+        """获取所有Deepseek模型（提供商的模型列表在启动后固定，结果会被缓存）"""
+        return self._deepseek_models
+
     async def get_models_response(self) -> ModelsResponse:
         """获取模型列表响应"""
         logger.info("开始获取模型列表响应")
@@ -141,6 +165,33 @@ class AIServiceManager:
         async for event in provider.chat_stream(request):
             yield event
     
+    async def chat_stream_raw(self, body: Dict[str, Any]) -> AsyncGenerator[StreamEvent, None]:
+        """流式对话（原始请求体）
+
+        先根据模型确定服务提供商，确认可用后才构建并校验完整的ChatRequest
+        """
+        model_id = body.get("model", "")
+        provider = self._get_provider_for_model(model_id)
+        if not provider:
+            yield StreamEvent(
+                type="error",
+                data={"error": f"不支持的模型: {model_id}"}
+            )
+            return
+
+        try:
+            request = ChatRequest.model_validate({**body, "stream": True})
+        except ValidationError as e:
+            yield StreamEvent(
+                type="error",
+                data={"error": f"请求参数验证失败: {str(e)}"}
+            )
+            return
+
+        logger.info(f"使用模型 {request.model} 进行流式对话")
+        async for event in provider.chat_stream(request):
+            yield event
+    
     def _get_provider_for_model(self, model_id: str) -> Optional[AIProviderBase]:
         """根据模型ID获取对应的服务提供商"""
         # OpenAI模型
@@ -155,14 +206,8 @@ class AIServiceManager:
         elif model_id.startswith('deepseek-'):
             return self.providers.get(ProviderType.DEEPSEEK)
 
-        # 尝试从所有提供商中找到匹配的模型
-        for provider in self.providers.values():
-            models = provider.get_available_models()
-            for model in models:
-                if model.value == model_id:  # 使用value字段进行匹配
-                    return provider
-
-        return None
+        # 尝试从所有提供商中找到匹配的模型（使用value字段进行匹配）
+        return self._model_provider_index.get(model_id)
     
     def is_model_available(self, model_id: str) -> bool:
         """检查模型是否可用"""
@@ -185,6 +230,12 @@ class AIServiceManager:
         
         return stats
     
+    def attach_http_client(self, http_client):
+        """为基于httpx的服务提供商注入应用级共享HTTP客户端"""
+        provider = self.providers.get(ProviderType.DEEPSEEK)
+        if provider:
+            provider.attach_http_client(http_client)
+
     async def cleanup(self):
         """清理所有服务提供商资源"""
         logger.info("正在清理AI服务管理器资源...")
@@ -5,7 +5,7 @@ Deepseek服务提供商实现
 
 import json
 import uuid
-from typing import List, Dict, Any, AsyncGenerator, Tuple
+from typing import List, Dict, Any, AsyncGenerator, Optional, Tuple
 import httpx
 
 from app.services.ai.base import AIProviderBase, ProviderType
@@ -15,11 +15,14 @@ from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Deepseek HTTP连接池容量，保证并发流式请求能复用已建立的连接
+DEEPSEEK_POOL_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+
 
 class DeepseekProvider(AIProviderBase):
     """Deepseek服务提供商"""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, http_client: Optional[httpx.AsyncClient] = None):
         super().__init__(api_key, ProviderType.DEEPSEEK)
         self.base_url = getattr(settings, 'DEEPSEEK_API_URL', 'https://api.deepseek.com/v1')
         self.timeout = getattr(settings, 'DEEPSEEK_TIMEOUT', 30)
@@ -30,41 +33,50 @@ class DeepseekProvider(AIProviderBase):
         self.models = ModelConfigParser.parse_deepseek_models()
         logger.info(f"Deepseek Provider加载了 {len(self.models)} 个模型")
 
+        # 认证头随每个请求发送，HTTP客户端可与其他服务共享
+        self.headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
         self.client = None
+        self._owns_client = True
+        if http_client is not None:
+            self.attach_http_client(http_client)
+
+    def attach_http_client(self, http_client: httpx.AsyncClient):
+        """使用外部共享的HTTP客户端（由应用生命周期负责关闭）"""
+        self.client = http_client
+        self._owns_client = False
     
     async def initialize(self):
         """初始化HTTP客户端"""
         if not self.client:
             self.client = httpx.AsyncClient(
                 timeout=self.timeout,
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                }
+                limits=DEEPSEEK_POOL_LIMITS
             )
+            self._owns_client = True
     
     async def cleanup(self):
         """清理资源"""
-        if self.client:
+        if self.client and self._owns_client:
             await self.client.aclose()
-            self.client = None
+        self.client = None
     
     def get_available_models(self) -> List[AIModel]:
         """获取可用模型列表"""
         # 添加调试信息
-        from app.utils.logger import get_logger
-        debug_logger = get_logger(__name__)
-        debug_logger.info(f"Deepseek Provider is_available(): {self.is_available()}")
-        debug_logger.info(f"Deepseek API key exists: {bool(self.api_key)}")
-        debug_logger.info(f"Models count: {len(self.models)}")
+        logger.info(f"Deepseek Provider is_available(): {self.is_available()}")
+        logger.info(f"Deepseek API key exists: {bool(self.api_key)}")
+        logger.info(f"Models count: {len(self.models)}")
 
         # 修复：始终返回加载的模型，不依赖is_available()检查
         # 因为API密钥存在且模型已加载，就应该显示在列表中
         if self.models:
-            debug_logger.info(f"返回Deepseek模型: {[model.value for model in self.models]}")
+            logger.info(f"返回Deepseek模型: {[model.value for model in self.models]}")
             return self.models
         else:
-            debug_logger.warning("Deepseek模型列表为空")
+            logger.warning("Deepseek模型列表为空")
             return []
     
     async def check_connection(self) -> Tuple[bool, str]:
@@ -84,7 +96,9 @@ class DeepseekProvider(AIProviderBase):
             
             response = await self.client.post(
                 f"{self.base_url}/chat/completions",
-                json=test_payload
+                json=test_payload,
+                headers=self.headers,
+                timeout=self.timeout
             )
             
             if response.status_code == 200:
@@ -109,7 +123,9 @@ class DeepseekProvider(AIProviderBase):
             
             response = await self.client.post(
                 f"{self.base_url}/chat/completions",
-                json=payload
+                json=payload,
+                headers=self.headers,
+                timeout=self.timeout
             )
             
             if response.status_code == 200:
@@ -144,7 +160,9 @@ class DeepseekProvider(AIProviderBase):
             async with self.client.stream(
                 "POST",
                 f"{self.base_url}/chat/completions",
-                json=payload
+                json=payload,
+                headers=self.headers,
+                timeout=self.timeout
             ) as response:
                 
                 if response.status_code != 200:
@@ -6,9 +6,12 @@ Deepseek服务 - 兼容性适配器
 from typing import Dict, List, Any, Optional, AsyncGenerator, Union, Iterator
 from datetime import datetime
 
+import httpx
+
 from app.services.ai.deepseek import get_deepseek_client
 from app.config.settings import settings
 from app.utils.logger import get_logger
+from app.utils.tasks import spawn_background
 
 logger = get_logger(__name__)
 
@@ -16,9 +19,9 @@ logger = get_logger(__name__)
 class DeepseekService:
     """Deepseek服务兼容性包装类"""
     
-    def __init__(self):
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
         """初始化Deepseek服务 - 兼容原接口"""
-        self.client = get_deepseek_client()  # 使用懒加载函数
+        self.client = get_deepseek_client(http_client)  # 使用懒加载函数
         
         # 保持原有属性以兼容现有代码
         self.api_key = settings.DEEPSEEK_API_KEY
@@ -154,10 +157,6 @@ class DeepseekService:
                 # 尝试清理，但不强制等待
                 loop = asyncio.get_event_loop()
                 if not loop.is_closed():
-                    loop.create_task(self.cleanup())
+                    spawn_background(self.cleanup(), loop)
         except:
             pass
-
-
-# 保持原有的全局实例导出以确保兼容性
-deepseek_service = DeepseekService()
\ No newline at end of file
@@ -0,0 +1,39 @@
+"""
+会话淘汰策略
+会话数达到上限时，综合闲置时间和命令执行次数选出最"冷"的会话
+"""
+
+from typing import Hashable, Iterable, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+
+# 评分权重：闲置时间和命令执行次数各占一半
+RECENCY_WEIGHT = 0.5
+FREQUENCY_WEIGHT = 0.5
+
+
+def pick_coldest(candidates: Iterable[Tuple[K, float, int]], now: float) -> Optional[K]:
+    """选出淘汰评分最高的会话
+
+    评分 = α·闲置时间/最大闲置时间 + β·(1 - 命令数/最大命令数)，
+    久未活跃且很少执行命令的会话先被淘汰，近期频繁使用的会话得以保留
+
+    Args:
+        candidates: (会话键, 最后活跃时间, 命令执行次数)
+        now: 当前时间戳
+
+    Returns:
+        应淘汰的会话键，没有候选时返回None
+    """
+    entries = [(key, max(now - (last_active or 0), 0.0), hits) for key, last_active, hits in candidates]
+    if not entries:
+        return None
+
+    max_idle = max(idle for _, idle, _ in entries) or 1.0
+    max_hits = max(hits for _, _, hits in entries) or 1
+    victim, _, _ = max(
+        entries,
+        key=lambda entry: RECENCY_WEIGHT * entry[1] / max_idle
+        + FREQUENCY_WEIGHT * (1 - entry[2] / max_hits)
+    )
+    return victim
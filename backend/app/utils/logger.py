@@ -6,6 +6,7 @@ from datetime import datetime
 from typing import Dict, Any, Optional
 import sys
 import os
+import time
 
 from app.config.settings import settings
 
@@ -155,8 +156,6 @@ class LoggerManager:
     
     def cleanup_old_logs(self, days_to_keep: int = 30):
         """清理过期的日志文件"""
-        import time
-        
         cutoff_time = time.time() - (days_to_keep * 24 * 60 * 60)
         cleaned_count = 0
         
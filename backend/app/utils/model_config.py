@@ -3,8 +3,8 @@
 从环境变量中解析AI模型配置信息
 """
 
-import os
 from typing import List, Dict, Any
+from app.config.settings import settings
 from app.models.ai import AIModel
 from app.utils.logger import get_logger
 
@@ -16,8 +16,8 @@ class ModelConfigParser:
     
     @staticmethod
     def parse_list_from_env(env_var: str, default_list: List[str] = None) -> List[str]:
-        """从环境变量解析逗号分隔的列表"""
-        value = os.getenv(env_var, '')
+        """从环境变量解析逗号分隔的列表（读取启动时加载的配置快照）"""
+        value = getattr(settings, env_var, None) or ''
         if not value.strip():
             return default_list or []
         return [item.strip() for item in value.split(',') if item.strip()]
@@ -0,0 +1,32 @@
+"""
+后台任务工具
+事件循环只弱引用任务对象，这里统一持有后台任务的强引用，避免任务在执行中途被垃圾回收
+"""
+
+import asyncio
+from typing import Any, Coroutine, Optional, Set
+
+# 运行中的后台任务，任务结束后自动移除
+_BG_TASKS: Set[asyncio.Task] = set()
+
+
+def spawn_background(coro: Coroutine[Any, Any, Any],
+                     loop: Optional[asyncio.AbstractEventLoop] = None) -> asyncio.Task:
+    """创建后台任务并在其结束前保持强引用"""
+    task = asyncio.ensure_future(coro, loop=loop)
+    _BG_TASKS.add(task)
+    task.add_done_callback(_BG_TASKS.discard)
+    return task
+
+
+async def cancel_and_wait(task: Optional[asyncio.Task], timeout: float = 5.0) -> None:
+    """取消任务并等待其真正结束，及时释放协程帧和回调，最多等待timeout秒"""
+    if task is None or task.done():
+        return
+    task.cancel()
+    # asyncio.wait不会把被取消任务的CancelledError抛给调用方，
+    # 而调用方自身被取消时仍会照常抛出CancelledError
+    await asyncio.wait({task}, timeout=timeout)
+    if task.done() and not task.cancelled():
+        # 任务在取消前已因异常结束时取走异常，避免"exception was never retrieved"告警
+        task.exception()
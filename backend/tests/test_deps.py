@@ -0,0 +1,57 @@
+"""
+服务依赖：Deepseek初始化失败的限时缓存
+"""
+
+import sys
+import types
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.api import deps
+
+
+@pytest.fixture
+def deepseek_module(monkeypatch):
+    """替换Deepseek服务模块，构造函数按attempts计数，fail为True时抛出异常"""
+    module = types.ModuleType("app.services.deepseek_service")
+    module.attempts = 0
+    module.fail = True
+
+    class DeepseekService:
+        def __init__(self, http_client=None):
+            module.attempts += 1
+            if module.fail:
+                raise ValueError("DEEPSEEK_API_KEY无效")
+
+    module.DeepseekService = DeepseekService
+    monkeypatch.setitem(sys.modules, module.__name__, module)
+    monkeypatch.setattr(deps, "settings", SimpleNamespace(DEEPSEEK_API_ENABLED=True))
+    monkeypatch.setattr(deps, "_deepseek_service", None)
+    monkeypatch.setattr(deps, "_deepseek_failure", None)
+    return module
+
+
+def _request():
+    return SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace()))
+
+
+async def test_failed_init_is_served_from_cache_until_it_expires(deepseek_module, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(deps, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+
+    for _ in range(3):
+        with pytest.raises(HTTPException) as exc_info:
+            await deps.get_deepseek_service(_request())
+        assert exc_info.value.status_code == 503
+    assert deepseek_module.attempts == 1
+
+    deepseek_module.fail = False
+    clock[0] += deps._DEEPSEEK_RETRY_INTERVAL
+
+    service = await deps.get_deepseek_service(_request())
+
+    assert isinstance(service, deepseek_module.DeepseekService)
+    assert deepseek_module.attempts == 2
+    assert deps._deepseek_failure is None
@@ -0,0 +1,61 @@
+"""
+会话淘汰策略：综合闲置时间和命令执行次数
+"""
+
+import time
+
+from app.core.terminal import TerminalManager
+from app.utils.eviction import pick_coldest
+
+
+def test_no_candidates():
+    assert pick_coldest([], 100.0) is None
+
+
+def test_idle_rarely_used_session_is_evicted():
+    candidates = [("busy", 90.0, 50), ("idle", 10.0, 1), ("new", 99.0, 0)]
+
+    assert pick_coldest(candidates, 100.0) == "idle"
+
+
+def test_frequently_used_session_outlives_slightly_more_recent_one():
+    candidates = [("frequent", 40.0, 100), ("rare", 50.0, 1)]
+
+    assert pick_coldest(candidates, 100.0) == "rare"
+
+
+class FakeSSHManager:
+    """模拟SSH管理器：按顺序分配会话ID并记录被断开的会话"""
+
+    def __init__(self):
+        self.connected = 0
+        self.disconnected = []
+
+    async def connect(self, host, port, username, password):
+        self.connected += 1
+        return True, "SSH连接成功", f"ssh-{self.connected}"
+
+    def get_session_info(self, session_id):
+        return {"device_info": "dev"}
+
+    async def disconnect(self, session_id):
+        self.disconnected.append(session_id)
+        return True, "已断开"
+
+
+async def test_terminal_manager_evicts_coldest_session_from_every_store():
+    manager = TerminalManager()
+    manager.session_check_task.cancel()
+    manager.ssh_manager = FakeSSHManager()
+    manager.max_sessions = 2
+    await manager.connect("ssh", "10.0.0.1", 22, "admin", "p")
+    await manager.connect("ssh", "10.0.0.2", 22, "admin", "p")
+    # ssh-2执行过命令，ssh-1新建后从未使用
+    manager.sessions["ssh-2"].last_activity = time.time()
+    manager.sessions["ssh-2"].command_count = 5
+
+    response = await manager.connect("ssh", "10.0.0.3", 22, "admin", "p")
+
+    assert response.success and response.session_id == "ssh-3"
+    assert manager.ssh_manager.disconnected == ["ssh-1"]
+    assert list(manager.sessions) == ["ssh-2", "ssh-3"]
@@ -0,0 +1,54 @@
+"""
+配置加载：API_PREFIX规范化与必需项验证
+"""
+
+from pathlib import Path
+
+import pytest
+
+from app.config.settings import _load_settings
+
+ENV_FILE = str(Path(__file__).resolve().parent.parent / ".env.example")
+
+
+@pytest.fixture(autouse=True)
+def _clean_prefix_env(monkeypatch):
+    monkeypatch.delenv("API_V1_STR", raising=False)
+
+
+@pytest.mark.parametrize("raw, prefix, v1", [
+    ("/", "", "/v1"),
+    ("api/", "/api", "/api/v1"),
+    ("/api/", "/api", "/api/v1"),
+    (" //api// ", "/api", "/api/v1"),
+    ("/api/net", "/api/net", "/api/net/v1"),
+])
+def test_api_prefix_is_normalized(monkeypatch, raw, prefix, v1):
+    monkeypatch.setenv("API_PREFIX", raw)
+
+    settings = _load_settings(ENV_FILE)
+
+    assert settings.API_PREFIX == prefix
+    assert settings.API_V1_STR == v1
+
+
+def test_explicit_api_v1_str_is_kept(monkeypatch):
+    monkeypatch.setenv("API_PREFIX", "/api")
+    monkeypatch.setenv("API_V1_STR", "/custom/v1")
+
+    assert _load_settings(ENV_FILE).API_V1_STR == "/custom/v1"
+
+
+@pytest.mark.parametrize("raw", ["", "   "])
+def test_blank_api_prefix_is_rejected(monkeypatch, raw):
+    monkeypatch.setenv("API_PREFIX", raw)
+
+    with pytest.raises(ValueError, match="API_PREFIX"):
+        _load_settings(ENV_FILE)
+
+
+def test_invalid_numeric_setting_raises_value_error(monkeypatch):
+    monkeypatch.setenv("PORT", "eight-thousand")
+
+    with pytest.raises(ValueError, match="PORT"):
+        _load_settings(ENV_FILE)
@@ -0,0 +1,153 @@
+"""
+SSH命令输出读取：提示符判定、分页处理、残留输出处理与读取时限
+"""
+
+import asyncio
+import threading
+
+from app.core.ssh import _PROMPT_TAIL_RE, SSHManager, SSHSession
+
+
+class FakeTransport:
+    def __init__(self):
+        # 已置位表示未在密钥重协商，可以直接发送
+        self.clear_to_send = threading.Event()
+        self.clear_to_send.set()
+
+
+class FakeShell:
+    """模拟paramiko shell通道：收到命令后由replies返回设备输出"""
+
+    def __init__(self, queue: asyncio.Queue, replies: dict):
+        self.queue = queue
+        self.replies = replies
+        self.active = True
+        self.closed = False
+        self.sent = []
+        self.sent_in_thread = []
+        self.transport = FakeTransport()
+        self.loop = asyncio.get_running_loop()
+
+    def get_transport(self) -> FakeTransport:
+        return self.transport
+
+    def send_ready(self) -> bool:
+        return True
+
+    def send(self, data: bytes) -> int:
+        self.sent.append(data)
+        command = data.decode().strip()
+        for delay, chunk in enumerate(self.replies.get(command, ())):
+            self.loop.call_soon_threadsafe(
+                self.loop.call_later, 0.01 * (delay + 1), self.queue.put_nowait, chunk
+            )
+        return len(data)
+
+    def sendall(self, data: bytes):
+        self.sent_in_thread.append(data)
+        self.send(data)
+
+
+def _make_session(manager: SSHManager, replies: dict) -> FakeShell:
+    queue = asyncio.Queue()
+    shell = FakeShell(queue, replies)
+    manager.clients["s1"] = SSHSession(None, shell, "10.0.0.1", 22, "admin", "", "dev", 0.0)
+    manager._output_queues[shell] = queue
+    return shell
+
+
+def test_prompt_tail_matches_prompt_without_newline():
+    assert _PROMPT_TAIL_RE.search(b"output\r\n<R1>")
+    assert _PROMPT_TAIL_RE.search(b"output\r\n[R1-GigabitEthernet0/0/1] ")
+    assert _PROMPT_TAIL_RE.search(b"output\r\nR1#")
+
+
+def test_prompt_tail_ignores_output_lines_ending_like_prompts():
+    assert not _PROMPT_TAIL_RE.search(b"Jan 1 10:00:00 R1 %%01SHELL/5/CMDRECORD[1]\r\n")
+    assert not _PROMPT_TAIL_RE.search(b"Huawei Versatile Routing Platform Software [V200R003]\r\n")
+    assert not _PROMPT_TAIL_RE.search(b"interface> \n")
+
+
+async def test_execute_command_ignores_stale_prompt():
+    manager = SSHManager()
+    shell = _make_session(manager, {
+        "display version": (b"display version\r\nVRP Version 5.170\r\n", b"<R1>"),
+    })
+    # 保活换行迟到的提示符仍留在队列中
+    shell.queue.put_nowait(b"\r\n<R1>")
+
+    success, output = await manager.execute_command("s1", "display version")
+
+    assert success
+    assert "VRP Version 5.170" in output
+    assert shell.queue.empty()
+
+
+async def test_execute_command_keeps_reading_past_lines_ending_with_bracket():
+    manager = SSHManager()
+    _make_session(manager, {
+        "display logbuffer": (
+            b"display logbuffer\r\nJan 1 R1 SHELL/5/CMDRECORD[1]\r\n",
+            b"Jan 1 R1 SHELL/5/CMDRECORD[2]\r\n",
+            b"<R1>",
+        ),
+    })
+
+    success, output = await manager.execute_command("s1", "display logbuffer")
+
+    assert success
+    assert "CMDRECORD[1]" in output and "CMDRECORD[2]" in output
+
+
+async def test_pagination_prompt_split_across_reads_is_answered():
+    manager = SSHManager()
+    shell = _make_session(manager, {
+        "display current-configuration": (
+            b"display current-configuration\r\nsysname R1\r\n  ---- Mo",
+            b"re ----",
+        ),
+        # 翻页的空格
+        "": (b"\r\ninterface GE0/0/1\r\n<R1>",),
+    })
+
+    success, output = await manager.execute_command("s1", "display current-configuration")
+
+    assert success
+    assert shell.sent[-1] == b" "
+    assert "More" not in output and "Mo" not in output
+    assert "sysname R1" in output and "interface GE0/0/1" in output
+
+
+async def test_send_during_rekey_moves_to_a_thread():
+    manager = SSHManager()
+    shell = _make_session(manager, {"display clock": (b"display clock\r\n10:00:00\r\n<R1>",)})
+    shell.transport.clear_to_send.clear()
+
+    success, output = await manager.execute_command("s1", "display clock")
+
+    # 重协商期间send会阻塞，命令不在事件循环中直接发送
+    assert success and "10:00:00" in output
+    assert shell.sent_in_thread == [b"display clock\n"]
+
+
+async def test_execute_command_stops_continuous_output_at_deadline():
+    manager = SSHManager()
+    manager.command_max_duration = 0.3
+    shell = _make_session(manager, {})
+    loop = asyncio.get_running_loop()
+
+    def emit_line(seq: int = 0):
+        # 持续输出且从不出现提示符，模拟长时间ping
+        shell.queue.put_nowait(b"Reply from 10.0.0.2: seq=%d\r\n" % seq)
+        shell.pending = loop.call_later(0.05, emit_line, seq + 1)
+
+    emit_line()
+    started = loop.time()
+    try:
+        success, output = await manager.execute_command("s1", "ping -t 10.0.0.2")
+    finally:
+        shell.pending.cancel()
+
+    assert success
+    assert loop.time() - started < 1
+    assert "seq=1" in output
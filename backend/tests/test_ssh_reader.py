@@ -0,0 +1,88 @@
+"""
+SSH通道读取器：由事件循环可读回调填充输出队列
+"""
+
+import asyncio
+import socket
+
+from app.core.ssh import SSHManager
+
+
+class SocketChannel:
+    """以socketpair模拟paramiko通道：fileno()在有数据或对端关闭时可读"""
+
+    def __init__(self):
+        self.sock, self.peer = socket.socketpair()
+        self.sock.setblocking(False)
+        self.closed = False
+        self.eof_received = False
+
+    def fileno(self) -> int:
+        return self.sock.fileno()
+
+    def recv_ready(self) -> bool:
+        try:
+            if self.sock.recv(1, socket.MSG_PEEK):
+                return True
+        except BlockingIOError:
+            return False
+        self.eof_received = True
+        return False
+
+    def recv(self, size: int) -> bytes:
+        return self.sock.recv(size)
+
+    def close(self):
+        self.closed = True
+        self.sock.close()
+        self.peer.close()
+
+
+async def _get(queue: asyncio.Queue) -> bytes:
+    return await asyncio.wait_for(queue.get(), 1)
+
+
+async def test_reader_queues_output_as_it_arrives():
+    manager = SSHManager()
+    channel = SocketChannel()
+    queue = manager._start_reader(channel)
+    try:
+        channel.peer.sendall(b"display version\r\n")
+        assert await _get(queue) == b"display version\r\n"
+
+        channel.peer.sendall(b"<R1>")
+        assert await _get(queue) == b"<R1>"
+        assert manager._output_queues[channel] is queue
+    finally:
+        manager._stop_reader(channel)
+        channel.close()
+
+
+async def test_reader_signals_channel_close_and_unregisters():
+    manager = SSHManager()
+    channel = SocketChannel()
+    queue = manager._start_reader(channel)
+    try:
+        channel.peer.close()
+
+        assert await _get(queue) == b""
+        # 回调已注销，不会继续在已关闭的通道上触发
+        assert not asyncio.get_running_loop().remove_reader(channel.fileno())
+    finally:
+        manager._stop_reader(channel)
+        channel.close()
+
+
+async def test_stopped_reader_no_longer_queues_output():
+    manager = SSHManager()
+    channel = SocketChannel()
+    queue = manager._start_reader(channel)
+    try:
+        manager._stop_reader(channel)
+        channel.peer.sendall(b"late output")
+        await asyncio.sleep(0.05)
+
+        assert queue.empty()
+        assert channel not in manager._output_queues
+    finally:
+        channel.close()
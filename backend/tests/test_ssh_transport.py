@@ -0,0 +1,45 @@
+"""
+SSH传输层调优：TCP套接字选项与保活
+"""
+
+import socket
+
+from app.core.ssh import _KEEPALIVE_INTERVAL, SSHManager
+
+
+class FakeTransport:
+    def __init__(self, sock):
+        self.sock = sock
+        self.keepalive = None
+
+    def set_keepalive(self, interval: int):
+        self.keepalive = interval
+
+
+class FakeClient:
+    def __init__(self, transport):
+        self.transport = transport
+
+    def get_transport(self):
+        return self.transport
+
+
+def test_tune_transport_disables_nagle_and_enables_keepalive():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        transport = FakeTransport(sock)
+
+        SSHManager._tune_transport(FakeClient(transport))
+
+        assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY)
+        assert sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE)
+        assert transport.keepalive == _KEEPALIVE_INTERVAL
+
+
+def test_tune_transport_tolerates_non_tcp_sockets():
+    # 经代理建立的连接可能使用不支持TCP选项的套接字
+    transport = FakeTransport(object())
+
+    SSHManager._tune_transport(FakeClient(transport))
+
+    assert transport.keepalive == _KEEPALIVE_INTERVAL
+    SSHManager._tune_transport(FakeClient(None))
@@ -0,0 +1,198 @@
+"""
+Telnet连接：基于asyncio流的登录、命令读取与分页处理
+"""
+
+import asyncio
+
+from app.core.network.base import ConnectionStatus
+from app.core.network.telnet.connection import TelnetConnection
+from app.core.network.telnet.protocols import DO, IAC, OPT_NAWS, WONT
+
+# 命令回复中的特殊步骤：等待客户端发送空格翻页
+PAGE = object()
+
+
+class FakeDevice:
+    """本地Telnet设备：协商选项、完成登录，并按replies回复命令
+
+    replies的值为回复步骤序列：bytes直接发送，float表示等待的秒数，PAGE表示等待翻页空格
+    """
+
+    def __init__(self, replies=None, send_login_prompt: bool = True):
+        self.replies = replies or {}
+        self.send_login_prompt = send_login_prompt
+        self.received = bytearray()
+        self.server = None
+
+    async def __aenter__(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _read_line(self, reader: asyncio.StreamReader) -> bytes:
+        line = await reader.readuntil(b"\n")
+        self.received += line
+        return line
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            if not self.send_login_prompt:
+                await reader.read()
+                return
+            writer.write(IAC + DO + OPT_NAWS + b"\r\nUsername:")
+            await self._read_line(reader)
+            writer.write(b"\r\nPassword:")
+            await self._read_line(reader)
+            writer.write(b"\r\nInfo: The max number of VTY users is 5.\r\n<R1>")
+            while True:
+                command = (await self._read_line(reader)).strip().decode()
+                if not command:
+                    writer.write(b"\r\n<R1>")
+                    continue
+                writer.write(command.encode() + b"\r\n")
+                for step in self.replies.get(command, ()):
+                    if step is PAGE:
+                        self.received += await reader.readexactly(1)
+                    elif isinstance(step, float):
+                        await writer.drain()
+                        await asyncio.sleep(step)
+                    else:
+                        writer.write(step)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _connect(device: FakeDevice) -> TelnetConnection:
+    connection = TelnetConnection("127.0.0.1", device.port, "admin", "secret")
+    success, message = await connection.connect(timeout=5)
+    assert success, message
+    return connection
+
+
+async def test_connect_logs_in_and_refuses_unsupported_options():
+    async with FakeDevice() as device:
+        connection = await _connect(device)
+
+        assert connection.status == ConnectionStatus.CONNECTED
+        assert connection.is_alive()
+        assert connection.home_prompt == b"<R1>"
+        assert connection.prompt_pattern == b">"
+        # 设备请求的NAWS被拒绝，随后依次收到用户名和密码
+        assert device.received.startswith(IAC + WONT + OPT_NAWS + b"admin\n")
+        assert b"secret\n" in device.received
+        await connection.disconnect()
+
+    assert not connection.is_alive()
+
+
+async def test_connect_fails_without_username_prompt():
+    async with FakeDevice(send_login_prompt=False) as device:
+        connection = TelnetConnection("127.0.0.1", device.port, "admin", "secret")
+        connection.login_timeout = 0.2
+
+        success, message = await connection.connect(timeout=5)
+
+    assert not success and message == "未收到用户名提示"
+    assert connection.status == ConnectionStatus.ERROR
+    assert connection.client is None
+
+
+async def test_execute_command_returns_output_without_echo_and_prompt():
+    async with FakeDevice({"display clock": (b"2026-10-16 10:00:00\r\n<R1>",)}) as device:
+        connection = await _connect(device)
+
+        success, output = await connection.execute_command("display clock")
+
+        assert success
+        assert output == "2026-10-16 10:00:00"
+        await connection.disconnect()
+
+
+async def test_execute_command_fails_when_not_connected():
+    connection = TelnetConnection("127.0.0.1", 23, "admin", "secret")
+
+    assert await connection.execute_command("display clock") == (False, "连接未建立")
+
+
+
+async def test_slow_streaming_output_is_not_cut_by_a_whole_response_timeout():
+    lines = tuple(step for seq in range(5) for step in (0.15, b"seq=%d\r\n" % seq))
+    async with FakeDevice({"ping 10.0.0.2": lines + (b"<R1>",)}) as device:
+        connection = await _connect(device)
+        # 单次读取超时大于数据块间隔，整个响应的耗时超过command_timeout
+        connection.socket_read_timeout = 0.3
+        connection.command_timeout = 0.3
+
+        success, output = await connection.execute_command("ping 10.0.0.2")
+
+        assert success
+        assert output.splitlines() == [f"seq={seq}" for seq in range(5)]
+        await connection.disconnect()
+
+
+async def test_command_read_stops_at_max_duration():
+    lines = tuple(step for seq in range(50) for step in (0.05, b"seq=%d\r\n" % seq))
+    async with FakeDevice({"ping 10.0.0.2": lines}) as device:
+        connection = await _connect(device)
+        connection.command_max_duration = 0.3
+
+        success, output = await connection.execute_command("ping 10.0.0.2")
+
+        assert success
+        assert "seq=0" in output and "seq=49" not in output
+        await connection.disconnect()
+
+
+async def test_command_returns_as_soon_as_prompt_arrives():
+    async with FakeDevice({"display clock": (0.05, b"2026-10-16 10:00:00\r\n<R1>")}) as device:
+        connection = await _connect(device)
+        connection.socket_read_timeout = 5.0
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+
+        success, output = await connection.execute_command("display clock")
+
+        # 提示符到达即返回，不等待单次读取超时
+        assert success and output == "2026-10-16 10:00:00"
+        assert loop.time() - started < 1
+        await connection.disconnect()
+
+
+async def test_pagination_prompt_split_across_reads_is_answered():
+    replies = {"display current-configuration": (
+        b"sysname R1\r\n  ---- Mo", 0.05, b"re ----", PAGE, b"\r\ninterface GE0/0/1\r\n<R1>",
+    )}
+    async with FakeDevice(replies) as device:
+        connection = await _connect(device)
+
+        success, output = await connection.execute_command("display current-configuration")
+
+        assert success
+        assert "More" not in output
+        assert "sysname R1" in output and "interface GE0/0/1" in output
+        assert device.received.endswith(b"display current-configuration\n ")
+        await connection.disconnect()
+
+
+def test_clean_response_matches_pager_text_case_insensitively_only():
+    connection = TelnetConnection("127.0.0.1", 23, "admin", "secret")
+    response = (
+        "display interface\r\n"
+        "GE0/0/1 \x1b[1mUP\x1b[0m\x1b[K\r\n"
+        "  --more--\r\n"
+        "PRESS ANY KEY TO CONTINUE\n"
+        "cursor\x1b[2Mmoved\x1b[3k\r\n"
+        "<R1>"
+    )
+
+    cleaned = connection._clean_command_response(response, "display interface")
+
+    # ANSI转义序列只移除m和K结尾的，ESC[…M与ESC[…k保持原样
+    assert cleaned == "GE0/0/1 UP\n  \ncursor\x1b[2Mmoved\x1b[3k"
@@ -0,0 +1,139 @@
+"""
+Telnet连接池：LRU-K淘汰、归还前的视图复位与断开会话的归还
+"""
+
+from collections import deque
+
+from app.core.network.base import DeviceType, NetworkConnection
+from app.core.network.telnet.manager import TelnetManager
+from app.core.network.telnet.pool import TelnetConnectionPool
+
+
+class FakeConnection(NetworkConnection):
+    """模拟已登录的Telnet连接，只提供连接池和会话管理用到的属性"""
+
+    def __init__(self, name: str, session_starts=(), reset_ok: bool = True, password: str = "p"):
+        super().__init__(name, 23, "admin", password)
+        self.session_id = self._info_template["session_id"] = name
+        self.session_starts = deque(session_starts, maxlen=2)
+        self.last_activity_time = 0.0
+        self.reset_ok = reset_ok
+        self.closed = False
+
+    async def connect(self, timeout: int = 30):
+        return True, "已连接"
+
+    async def execute_command(self, command: str):
+        return True, ""
+
+    def is_alive(self) -> bool:
+        return not self.closed
+
+    async def reset_for_pool(self) -> bool:
+        return self.reset_ok
+
+    async def disconnect(self):
+        self.closed = True
+        return True, "已断开"
+
+
+def _pooled(pool: TelnetConnectionPool):
+    return {connection.host for idle in pool._pool.values() for connection in idle}
+
+
+async def test_full_pool_evicts_one_shot_connection_first():
+    pool = TelnetConnectionPool(max_size=2)
+    reused = FakeConnection("reused", session_starts=(10.0, 20.0))
+    one_shot = FakeConnection("one-shot", session_starts=(30.0,))
+    await pool.release(reused)
+    await pool.release(one_shot)
+
+    newcomer = FakeConnection("newcomer", session_starts=(5.0, 40.0))
+    assert (await pool.release(newcomer))[0]
+
+    assert _pooled(pool) == {"reused", "newcomer"}
+    assert pool.get_stats()["evictions"] == 1
+    await pool.close()
+
+
+async def test_full_pool_evicts_oldest_kth_session_start():
+    pool = TelnetConnectionPool(max_size=2)
+    await pool.release(FakeConnection("old", session_starts=(1.0, 100.0)))
+    await pool.release(FakeConnection("recent", session_starts=(50.0, 60.0)))
+
+    await pool.release(FakeConnection("newcomer", session_starts=(70.0, 80.0)))
+
+    assert _pooled(pool) == {"recent", "newcomer"}
+    await pool.close()
+
+
+async def test_one_shot_connection_does_not_displace_reused_ones():
+    pool = TelnetConnectionPool(max_size=1)
+    await pool.release(FakeConnection("reused", session_starts=(10.0, 20.0)))
+
+    one_shot = FakeConnection("one-shot", session_starts=(30.0,))
+    await pool.release(one_shot)
+
+    assert one_shot.closed
+    assert _pooled(pool) == {"reused"}
+    await pool.close()
+
+
+async def test_connection_left_in_another_view_is_closed_instead_of_pooled():
+    pool = TelnetConnectionPool()
+    connection = FakeConnection("config-mode", reset_ok=False)
+
+    await pool.release(connection)
+
+    assert connection.closed
+    assert pool.get_stats()["idle_connections"] == 0
+
+
+async def test_acquire_requires_matching_password():
+    pool = TelnetConnectionPool()
+    await pool.release(FakeConnection("r1", session_starts=(1.0,)))
+    key = ("r1", 23, "admin", DeviceType.UNKNOWN.value)
+
+    assert pool.acquire(*key[:3], "wrong", key[3]) is None
+    connection = pool.acquire(*key[:3], "p", key[3])
+
+    assert connection is not None and len(connection.session_starts) == 2
+    await pool.close()
+
+
+async def test_reused_connection_reports_its_new_session_id():
+    pool = TelnetConnectionPool()
+    previous = FakeConnection("r1", session_starts=(1.0,))
+    await pool.release(previous)
+
+    connection = pool.acquire("r1", 23, "admin", "p")
+
+    assert connection is previous and connection.session_id != "r1"
+    assert connection.get_info()["session_id"] == connection.session_id
+    await pool.close()
+
+
+async def test_disconnect_returns_session_to_pool():
+    manager = TelnetManager()
+    manager.pool = TelnetConnectionPool()
+    connection = FakeConnection("r1", session_starts=(1.0,))
+    manager.sessions[connection.session_id] = connection
+
+    assert (await manager.disconnect("r1"))[0]
+
+    assert not manager.sessions
+    assert not connection.closed and _pooled(manager.pool) == {"r1"}
+    await manager.pool.close()
+    assert connection.closed
+
+
+async def test_disconnect_closes_session_that_cannot_be_pooled():
+    manager = TelnetManager()
+    manager.pool = TelnetConnectionPool()
+    connection = FakeConnection("config-mode", reset_ok=False)
+    manager.sessions[connection.session_id] = connection
+
+    await manager.disconnect("config-mode")
+
+    assert connection.closed
+    assert manager.pool.get_stats()["idle_connections"] == 0
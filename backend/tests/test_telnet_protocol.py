@@ -0,0 +1,62 @@
+"""
+Telnet协议处理：IAC命令分离与跨读取拆分的命令序列
+"""
+
+from app.core.network.telnet.protocols import (
+    DO,
+    DONT,
+    IAC,
+    OPT_ECHO,
+    OPT_NAWS,
+    OPT_SGA,
+    SB,
+    SE,
+    WILL,
+    WONT,
+    TelnetProtocol,
+)
+
+process_incoming = TelnetProtocol.process_incoming
+
+
+def test_plain_data_passes_through():
+    assert process_incoming(b"<R1>") == (b"<R1>", b"", b"")
+
+
+def test_option_requests_are_refused():
+    data = b"Username:" + IAC + DO + OPT_NAWS + IAC + WILL + OPT_ECHO + IAC + WONT + OPT_SGA
+
+    payload, reply, pending = process_incoming(data)
+
+    assert payload == b"Username:"
+    assert reply == IAC + WONT + OPT_NAWS + IAC + DONT + OPT_ECHO
+    assert pending == b""
+
+
+def test_escaped_iac_is_kept_as_data():
+    assert process_incoming(b"a" + IAC + IAC + b"b") == (b"a\xffb", b"", b"")
+
+
+def test_subnegotiation_is_skipped():
+    data = b"x" + IAC + SB + OPT_NAWS + b"\x00\x50\x00\x18" + IAC + SE + b"y"
+
+    assert process_incoming(data) == (b"xy", b"", b"")
+
+
+def test_incomplete_sequences_are_returned_as_pending():
+    assert process_incoming(b"abc" + IAC) == (b"abc", b"", IAC)
+    assert process_incoming(b"abc" + IAC + DO) == (b"abc", b"", IAC + DO)
+    assert process_incoming(b"abc" + IAC + SB + OPT_NAWS + b"\x00") == (
+        b"abc", b"", IAC + SB + OPT_NAWS + b"\x00"
+    )
+
+
+def test_split_sequence_completes_on_next_read():
+    payload, reply, pending = process_incoming(b"Password:" + IAC)
+    assert payload == b"Password:" and pending == IAC
+
+    payload, reply, pending = process_incoming(pending + WILL + OPT_ECHO + b"\r\n")
+
+    assert payload == b"\r\n"
+    assert reply == IAC + DONT + OPT_ECHO
+    assert pending == b""